@@ -0,0 +1,88 @@
+"""Bake reduced-resolution variants of stage and character images.
+
+    python bake_assets.py                      # assets/backgrounds and assets/characters
+    python bake_assets.py assets/characters/crovan --factors 0.5 --force
+
+Every png and gif gets siblings like `idle@0.5x.gif`. The game picks the
+smallest variant that still has a texel per screen pixel at the sprite's
+scale times the stage zoom, and falls back to the original when none exists.
+"""
+import argparse
+import pathlib
+import sys
+
+from PIL import Image, ImageSequence
+
+from sources.utils.asset_cache import VARIANT_FACTORS, is_current, variant_path
+
+DEFAULT_DIRECTORIES = ("assets/backgrounds", "assets/characters")
+SUFFIXES = (".png", ".gif")
+
+
+def _is_variant(path: pathlib.Path) -> bool:
+    return "@" in path.stem
+
+
+def _scaled_size(image: Image.Image, factor: float) -> tuple[int, int]:
+    return max(1, round(image.width * factor)), max(1, round(image.height * factor))
+
+
+def _bake_png(source: pathlib.Path, target: pathlib.Path, factor: float):
+    with Image.open(source) as image:
+        image = image.convert("RGBA")
+        image.resize(_scaled_size(image, factor), Image.Resampling.LANCZOS).save(target, optimize=True)
+
+
+def _bake_gif(source: pathlib.Path, target: pathlib.Path, factor: float):
+    with Image.open(source) as image:
+        frames, durations = [], []
+        for frame in ImageSequence.Iterator(image):
+            durations.append(frame.info.get("duration", image.info.get("duration", 100)))
+            rgba = frame.convert("RGBA")
+            frames.append(rgba.resize(_scaled_size(rgba, factor), Image.Resampling.LANCZOS))
+        loop = image.info.get("loop", 0)
+
+    # every frame is a full image, so each one replaces the previous instead of being drawn over it
+    frames[0].save(target, save_all=True, append_images=frames[1:], duration=durations,
+                   loop=loop, disposal=2, optimize=False)
+
+
+def bake(source: pathlib.Path, factors, force: bool = False) -> list[pathlib.Path]:
+    written = []
+    for factor in factors:
+        target = variant_path(source, factor)
+        if not force and is_current(target, source):
+            continue
+        if source.suffix == ".gif":
+            _bake_gif(source, target, factor)
+        else:
+            _bake_png(source, target, factor)
+        written.append(target)
+    return written
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="*", type=pathlib.Path, default=[pathlib.Path(d) for d in DEFAULT_DIRECTORIES],
+                        help="files or directories searched recursively")
+    parser.add_argument("--factors", type=float, nargs="+", default=list(VARIANT_FACTORS),
+                        help="resolution factors to bake; the game only looks for VARIANT_FACTORS")
+    parser.add_argument("--force", action="store_true", help="rebake variants that are already up to date")
+    args = parser.parse_args(argv)
+
+    sources = []
+    for path in args.paths:
+        candidates = [path] if path.is_file() else sorted(path.rglob("*"))
+        sources += [p for p in candidates if p.suffix.lower() in SUFFIXES and not _is_variant(p)]
+
+    baked = 0
+    for source in sources:
+        for target in bake(source, args.factors, args.force):
+            print(f"baked {target}")
+            baked += 1
+    print(f"\n{baked} variants written for {len(sources)} images")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
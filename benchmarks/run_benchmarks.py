@@ -0,0 +1,228 @@
+"""Gameplay benchmarks on synthetic charts.
+
+Run from the repository root:
+
+    python -m benchmarks.run_benchmarks                          # print results
+    python -m benchmarks.run_benchmarks --save benchmarks/baselines/local.json
+    python -m benchmarks.run_benchmarks --compare benchmarks/baselines/local.json
+
+Results are written in the pytest-benchmark JSON layout. `--compare` exits
+with status 1 when any median is slower than the baseline by more than
+`--threshold`.
+
+Simulations spawn notes as far ahead as the 720p game view does, so the
+per-tick benchmarks carry the load of a real session; `--spawn-distance`
+sets another lead in scroll pixels.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+from sources.game import HeadlessSimulation
+from sources.game.simulation import SIMULATION_TICK_MS
+from sources.utils.event_bus import EventBus
+from benchmarks.synthetic_chart import generate_chart, SCENARIOS
+
+WARMUP_MS = 5000
+DEFAULT_ROUNDS = 2000
+DEFAULT_THRESHOLD = 0.15
+
+
+def _stats(name: str, group: str, samples_ns: list[int]) -> dict:
+    samples = [s / 1e9 for s in samples_ns]
+    mean = statistics.fmean(samples)
+    return {
+        "name": name,
+        "group": group,
+        "stats": {
+            "min": min(samples),
+            "max": max(samples),
+            "mean": mean,
+            "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            "median": statistics.median(samples),
+            "rounds": len(samples),
+            "ops": 1 / mean if mean > 0 else 0.0,
+        },
+    }
+
+
+def bench_chart_parsing(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    sim = HeadlessSimulation(chart, spawn_distance=spawn_distance)
+    note_mgr = sim.note_mgr
+    samples = []
+    try:
+        for _ in range(max(rounds // 100, 5)):
+            start = time.perf_counter_ns()
+            note_mgr.chart = note_mgr._parse_chart()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        sim.close()
+    return samples
+
+
+def bench_note_fixed_update(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    sim = HeadlessSimulation(chart, is_bot_play=True, spawn_distance=spawn_distance)
+    samples = []
+    try:
+        sim.run_until(WARMUP_MS)
+        for _ in range(rounds):
+            sim.song_mgr.inst_player.advance(SIMULATION_TICK_MS)
+            sim.song_mgr.update()
+            start = time.perf_counter_ns()
+            sim.note_mgr.fixed_update(SIMULATION_TICK_MS / 1000)
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        sim.close()
+    return samples
+
+
+def bench_note_frame(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    """Per drawn frame note work: head animations plus placing notes from song time."""
+    sim = HeadlessSimulation(chart, is_bot_play=True, spawn_distance=spawn_distance)
+    samples = []
+    try:
+        sim.run_until(WARMUP_MS)
+        for _ in range(rounds):
+            sim.step()
+            start = time.perf_counter_ns()
+            sim.note_mgr.update(SIMULATION_TICK_MS / 1000)
+            sim.note_mgr.sync_positions()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        sim.close()
+    return samples
+
+
+def bench_process_hit(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    sim = HeadlessSimulation(chart, spawn_distance=spawn_distance)
+    note_mgr = sim.note_mgr
+    samples = []
+    try:
+        sim.run_until(WARMUP_MS)
+        targets = [note for note in note_mgr.notes if not note.is_opponent and not note.is_hit and not note.is_miss]
+        if not targets:
+            return samples
+        for i in range(rounds):
+            target = targets[i % len(targets)]
+            start = time.perf_counter_ns()
+            hit_note = note_mgr._process_hit(target.direction_index, target.strum_time)
+            samples.append(time.perf_counter_ns() - start)
+            if hit_note is not None:
+                hit_note.is_hit = False
+    finally:
+        sim.close()
+    return samples
+
+
+def bench_song_update(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    sim = HeadlessSimulation(chart, spawn_distance=spawn_distance)
+    song_mgr = sim.song_mgr
+    samples = []
+    try:
+        for _ in range(rounds):
+            song_mgr.inst_player.advance(SIMULATION_TICK_MS)
+            start = time.perf_counter_ns()
+            song_mgr.update()
+            samples.append(time.perf_counter_ns() - start)
+    finally:
+        sim.close()
+    return samples
+
+
+def bench_event_bus_publish(chart: dict, rounds: int, spawn_distance: float = None) -> list[int]:
+    bus = EventBus()
+    for _ in range(8):
+        bus.subscribe("player_pressed", lambda direction_index, note: None)
+    samples = []
+    for i in range(rounds):
+        start = time.perf_counter_ns()
+        bus.publish("player_pressed", direction_index=i % 4, note=None)
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+
+BENCHMARKS = {
+    "chart_parsing": bench_chart_parsing,
+    "note_fixed_update": bench_note_fixed_update,
+    "note_frame": bench_note_frame,
+    "process_hit": bench_process_hit,
+    "song_update": bench_song_update,
+    "event_bus_publish": bench_event_bus_publish,
+}
+
+
+def run(scenarios: list[str], benchmarks: list[str], rounds: int, spawn_distance: float = None) -> dict:
+    results = []
+    for scenario in scenarios:
+        chart = generate_chart(**SCENARIOS[scenario])
+        for bench_name in benchmarks:
+            samples = BENCHMARKS[bench_name](chart, rounds, spawn_distance)
+            if not samples:
+                continue
+            result = _stats(f"{bench_name}[{scenario}]", bench_name, samples)
+            result["params"] = {"spawn_distance": spawn_distance}
+            results.append(result)
+            stats = result["stats"]
+            print(f"{result['name']:<36} median {stats['median'] * 1e6:9.2f} us   "
+                  f"mean {stats['mean'] * 1e6:9.2f} us   max {stats['max'] * 1e6:9.2f} us   rounds {stats['rounds']}")
+
+    return {
+        "machine_info": {
+            "python_version": platform.python_version(),
+            "machine": platform.machine(),
+            "processor": platform.processor(),
+            "system": platform.system(),
+        },
+        "datetime": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "benchmarks": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list[str]:
+    """Return a line for every benchmark whose median regressed past *threshold*."""
+    baseline_medians = {b["name"]: b["stats"]["median"] for b in baseline["benchmarks"]}
+    regressions = []
+    for bench in report["benchmarks"]:
+        old = baseline_medians.get(bench["name"])
+        new = bench["stats"]["median"]
+        if old and new > old * (1 + threshold):
+            regressions.append(f"{bench['name']}: {old * 1e6:.2f} us -> {new * 1e6:.2f} us (+{(new / old - 1) * 100:.1f}%)")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="chart scenario (repeatable, default: all)")
+    parser.add_argument("--bench", action="append", choices=sorted(BENCHMARKS), help="benchmark (repeatable, default: all)")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="timed rounds per benchmark")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to check the results against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed median slowdown, 0.15 = 15%%")
+    parser.add_argument("--spawn-distance", type=float, help="note spawn lead in scroll pixels (default: the 720p view's)")
+    args = parser.parse_args(argv)
+
+    report = run(args.scenario or list(SCENARIOS), args.bench or list(BENCHMARKS), args.rounds, args.spawn_distance)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or ".", exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"saved {args.save}")
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            regressions = compare(report, json.load(f), args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""Synthetic chart generation for the gameplay benchmarks."""
+import random
+
+STEPS_PER_SECTION = 16
+
+
+def generate_chart(
+    nps: float = 10,
+    note_count: int = 1000,
+    sustain_ratio: float = 0.0,
+    sustain_ms: tuple[float, float] = (150, 900),
+    note_types: dict[str, float] = None,
+    opponent_ratio: float = 0.5,
+    bpm: float = 150,
+    speed: float = 2.5,
+    scroll_changes: int = 0,
+    seed: int = 0,
+) -> dict:
+    """Build song data in the chart format `NoteManager` reads.
+
+    *nps* is the density over both sides, *sustain_ratio* the share of notes
+    that are holds and *note_types* a weight table like {"default": 9, "jewel_note": 1}.
+    *scroll_changes* spreads that many scroll velocity changes over the chart.
+    """
+    rng = random.Random(seed)
+    note_types = note_types or {"default": 1}
+    type_names = list(note_types)
+    type_weights = [note_types[name] for name in type_names]
+
+    section_ms = (60000 / bpm) / 4 * STEPS_PER_SECTION
+    interval_ms = 1000 / nps
+
+    raw_notes = []
+    for i in range(note_count):
+        strum_time = 1000 + i * interval_ms
+        is_opponent = rng.random() < opponent_ratio
+        lane = rng.randrange(4)
+        sustain = rng.uniform(*sustain_ms) if rng.random() < sustain_ratio else 0
+        note_type = rng.choices(type_names, type_weights)[0]
+        raw_notes.append((strum_time, is_opponent, lane, sustain, note_type))
+
+    section_count = int(raw_notes[-1][0] // section_ms) + 2 if raw_notes else 1
+    sections = [{
+        "lengthInSteps": STEPS_PER_SECTION,
+        "mustHitSection": i % 2 == 0,
+        "sectionNotes": [],
+    } for i in range(section_count)]
+
+    for strum_time, is_opponent, lane, sustain, note_type in raw_notes:
+        section = sections[int(strum_time // section_ms)]
+        # lanes 0-3 belong to the side the section focuses on, 4-7 to the other one
+        own_side = is_opponent != section["mustHitSection"]
+        raw_note = [strum_time, lane if own_side else lane + 4, sustain]
+        if note_type != "default":
+            raw_note.append(note_type)
+        section["sectionNotes"].append(raw_note)
+
+    chart_ms = 1000 + note_count * interval_ms
+    scroll_velocities = [{"time": chart_ms * (i + 1) / (scroll_changes + 1), "multiplier": rng.uniform(0.5, 2.0)}
+                         for i in range(scroll_changes)]
+
+    return {
+        "player_name": "null",
+        "opponent_name": "crovan",
+        "sub_character_name": "",
+        "name": "synthetic",
+        "background": "crovan_stage",
+        "receptor_name": "default",
+        "inst_path": "",
+        "voices_path": "",
+        "bpm": bpm,
+        "speed": speed,
+        "scrollVelocities": scroll_velocities,
+        "notes": sections,
+    }
+
+
+SCENARIOS = {
+    "stream_10k": dict(nps=20, note_count=10000),
+    "all_holds": dict(nps=6, note_count=2000, sustain_ratio=1.0),
+    "mixed_types": dict(nps=12, note_count=4000, sustain_ratio=0.25,
+                        note_types={"default": 8, "alt_animation": 1, "jewel_note": 1}),
+    "dense_jacks": dict(nps=30, note_count=6000, opponent_ratio=0.0),
+    "scroll_changes": dict(nps=12, note_count=4000, sustain_ratio=0.25, scroll_changes=2000),
+}
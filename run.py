@@ -6,9 +6,10 @@ SCREEN_HEIGHT = 720
 WINDOW_NAME = "Friday Night Funkin : RefEngine"
 FULLSCREEN = False
 ANTIALIASING = True
-UPDATE_RATE = 1/240
-FIXED_RATE = 1/60
-DRAW_RATE = 1/240
+UPDATE_RATE = 1/240   # animations, camera and interface; arcade needs it at least as fast as DRAW_RATE
+FIXED_RATE = 1/120    # gameplay tick: spawning, misses, bot/opponent input
+DRAW_RATE = 1/240     # until a view's FrameScheduler switches both rates to the display refresh
+CALIBRATE = False     # measure audio/visual offsets before the song
 
 class Application:
     def __init__(self):
@@ -29,7 +30,10 @@ class Application:
         arcade.load_font("assets/fonts/MBC 1961 M.ttf")
         arcade.load_font("assets/fonts/Paperlogy-8ExtraBold.ttf")
 
-        self.stage_view = MainGameView("endless-D")
+        if CALIBRATE:
+            self.stage_view = CalibrationView(next_view=lambda: MainGameView("endless-D"))
+        else:
+            self.stage_view = MainGameView("endless-D")
         
         self.window.show_view(self.stage_view)
         arcade.run()
@@ -0,0 +1,4 @@
+from .pcm          import PcmBuffer, PcmSource, decode_sound
+from .pcm_cache    import load_pcm
+from .rate_stream  import RatePlayback, MIN_PLAYBACK_RATE, MAX_PLAYBACK_RATE
+from .stem_sync    import StemSync
\ No newline at end of file
@@ -0,0 +1,67 @@
+"""Decoded audio as NumPy arrays, for the DSP that pyglet's players can't do."""
+import arcade
+import numpy as np
+from pyglet.media.codecs.base import AudioData, AudioFormat, StreamingSource
+
+READ_CHUNK_BYTES = 1 << 20
+
+
+class PcmBuffer:
+    """Signed 16-bit samples of shape (frames, channels) at `sample_rate`."""
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        self.samples = samples
+        self.sample_rate = sample_rate
+
+    @property
+    def frames(self) -> int:
+        return self.samples.shape[0]
+
+    @property
+    def channels(self) -> int:
+        return self.samples.shape[1]
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+
+def decode_sound(sound: arcade.Sound) -> PcmBuffer:
+    """Read every sample of a sound loaded with streaming=False (arcade's default)."""
+    source = sound.source.get_queue_source()
+    audio_format = source.audio_format
+    if audio_format.sample_size != 16:
+        raise ValueError(f"{sound.file_name}: {audio_format.sample_size}-bit audio, only 16-bit is supported")
+
+    source.seek(0)
+    chunks = []
+    while (data := source.get_audio_data(READ_CHUNK_BYTES)) is not None:
+        chunks.append(bytes(data.data[:data.length]))
+    samples = np.frombuffer(b"".join(chunks), dtype=np.int16).reshape(-1, audio_format.channels)
+    return PcmBuffer(samples, audio_format.sample_rate)
+
+
+class PcmSource(StreamingSource):
+    """Streams a PcmBuffer to a pyglet player.
+
+    Reading is a slice of the sample array and a seek just moves the frame
+    index, so both are exact to the sample and cost nothing to start.
+    """
+    def __init__(self, buffer: PcmBuffer):
+        self._buffer = buffer
+        self.audio_format = AudioFormat(buffer.channels, 16, buffer.sample_rate)
+        self.video_format = None
+        self._duration = buffer.duration
+        self._frame = 0
+
+    def seek(self, timestamp: float):
+        self._frame = min(max(0, round(timestamp * self._buffer.sample_rate)), self._buffer.frames)
+
+    def get_audio_data(self, num_bytes: int, compensation_time: float = 0.0) -> AudioData | None:
+        start = self._frame
+        end = min(start + num_bytes // self.audio_format.bytes_per_frame, self._buffer.frames)
+        if end <= start:
+            return None
+        self._frame = end
+        data = self._buffer.samples[start:end].tobytes()
+        sample_rate = self._buffer.sample_rate
+        return AudioData(data, len(data), start / sample_rate, (end - start) / sample_rate)
@@ -0,0 +1,60 @@
+"""Songs decoded once to raw PCM files next to the originals, then memory-mapped.
+
+`Inst.ogg` gets a sibling `Inst.pcm`: a small header followed by the int16
+samples exactly as PcmBuffer holds them. Loading a cached file maps it
+instead of reading it, so starting a song costs no decoding, pages are only
+read as playback reaches them, and restarts share them through the OS page
+cache. A cache file older than its source is decoded again.
+"""
+import os
+import pathlib
+import struct
+
+import arcade
+import numpy as np
+
+from .pcm import PcmBuffer, decode_sound
+
+CACHE_SUFFIX = ".pcm"
+_MAGIC = b"RFPCM\x01"
+# magic, sample rate, channels, padded so the samples start 16-byte aligned
+_HEADER = struct.Struct("<6sIH4x")
+
+
+def cache_path(path) -> pathlib.Path:
+    return pathlib.Path(path).with_suffix(CACHE_SUFFIX)
+
+
+def _read_cache(path: pathlib.Path) -> PcmBuffer | None:
+    with open(path, "rb") as file:
+        header = file.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        return None
+    magic, sample_rate, channels = _HEADER.unpack(header)
+    if magic != _MAGIC or channels == 0:
+        return None
+    samples = np.memmap(path, dtype=np.int16, mode="r", offset=_HEADER.size)
+    return PcmBuffer(samples.reshape(-1, channels), sample_rate)
+
+
+def write_cache(buffer: PcmBuffer, path) -> pathlib.Path:
+    target = pathlib.Path(path)
+    temporary = target.with_name(target.name + ".tmp")
+    with open(temporary, "wb") as file:
+        file.write(_HEADER.pack(_MAGIC, buffer.sample_rate, buffer.channels))
+        file.write(np.ascontiguousarray(buffer.samples, dtype=np.int16).tobytes())
+    # a crash mid-write leaves the .tmp behind, never a truncated cache
+    os.replace(temporary, target)
+    return target
+
+
+def load_pcm(path) -> PcmBuffer:
+    """Samples of the audio file at *path*, memory-mapped from its PCM cache (written first if missing or stale)."""
+    source = pathlib.Path(path)
+    cached = cache_path(source)
+    if cached.exists() and cached.stat().st_mtime >= source.stat().st_mtime:
+        buffer = _read_cache(cached)
+        if buffer is not None:
+            return buffer
+    write_cache(decode_sound(arcade.load_sound(source)), cached)
+    return _read_cache(cached)
@@ -0,0 +1,196 @@
+"""Songs played faster or slower than recorded, resampled off the game thread."""
+import collections
+import queue
+import threading
+
+import numpy as np
+import pyglet
+from pyglet.media.codecs.base import AudioData, AudioFormat, StreamingSource
+
+from .pcm import PcmBuffer
+
+MIN_PLAYBACK_RATE = 0.5
+MAX_PLAYBACK_RATE = 2.0
+CHUNK_FRAMES = 4096
+BUFFERED_CHUNKS = 8
+# chunks in hand before playback starts, and how long starting may wait for each
+PRIMED_CHUNKS = 4
+CHUNK_WAIT_S = 0.05
+
+
+class _ResampleWorker(threading.Thread):
+    """Resamples every stem from the same read position and mixes them into one chunk at a time.
+
+    Mixing here means the stems leave the device as one stream, so nothing
+    downstream can pull them apart. Positions count frames at the highest
+    stem sample rate; a stem at another rate is read at its own, scaled
+    position. A stem that ends first is mixed as silence until the longest
+    one ends.
+    """
+    def __init__(self, buffers: list[PcmBuffer], rate: float, start_frame: float):
+        super().__init__(name="resample", daemon=True)
+        self._buffers = buffers
+        self._rate = rate
+        self._position = start_frame
+        self.channels = max(buffer.channels for buffer in buffers)
+        self.sample_rate = max(buffer.sample_rate for buffer in buffers)
+        # stem frames per output frame
+        self._steps = [buffer.sample_rate / self.sample_rate for buffer in buffers]
+        self._frames = max(buffer.duration for buffer in buffers) * self.sample_rate
+        self.chunks = queue.Queue(maxsize=BUFFERED_CHUNKS)
+        self._halt = threading.Event()
+
+    def _chunk(self, samples: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        # linear interpolation between neighbouring frames, all channels at once
+        last = samples.shape[0] - 1
+        left = np.minimum(positions.astype(np.int64), last)
+        right = np.minimum(left + 1, last)
+        fraction = (positions - left)[:, None]
+        return samples[left] + (samples[right].astype(np.float32) - samples[left]) * fraction
+
+    def _mix(self, positions: np.ndarray) -> bytes:
+        mixed = np.zeros((len(positions), self.channels), dtype=np.float32)
+        for buffer, step in zip(self._buffers, self._steps):
+            stem_positions = positions * step
+            # positions only grow, so the ones still inside the stem come first
+            inside = np.searchsorted(stem_positions, buffer.frames)
+            # a mono stem broadcasts onto every channel
+            mixed[:inside] += self._chunk(buffer.samples, stem_positions[:inside])
+        return np.clip(mixed, -32768, 32767).astype(np.int16).tobytes()
+
+    def run(self):
+        frames = self._frames
+        offsets = np.arange(CHUNK_FRAMES) * self._rate
+        while not self._halt.is_set():
+            positions = self._position + offsets
+            positions = positions[positions < frames]
+            chunk = self._mix(positions) if len(positions) else None
+            while not self._halt.is_set():
+                try:
+                    self.chunks.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            if chunk is None:
+                return
+            self._position += CHUNK_FRAMES * self._rate
+
+    def stop(self):
+        self._halt.set()
+
+
+class _ChunkSource(StreamingSource):
+    """Hands the worker's mixed chunks to a pyglet player without ever blocking the audio thread.
+
+    When the worker falls behind, the device gets silence and the same
+    number of bytes is dropped from the next chunks. The audio then carries
+    on where the player's clock says it is, instead of running late for the
+    rest of the song.
+    """
+    def __init__(self, chunks: queue.Queue, channels: int, sample_rate: int, duration: float, primed: list = ()):
+        self._chunks = chunks
+        # taken before the queue: chunks the game thread already fetched, maybe ending in the end marker
+        self._primed = collections.deque(primed)
+        self.audio_format = AudioFormat(channels, 16, sample_rate)
+        self.video_format = None
+        self._duration = duration
+        self._pending = b""
+        self._ended = False
+        self._skip = 0
+        self._timestamp = 0.0
+        self.underruns = 0
+
+    def get_audio_data(self, num_bytes: int, compensation_time: float = 0.0) -> AudioData | None:
+        while len(self._pending) < num_bytes and not self._ended:
+            try:
+                chunk = self._primed.popleft() if self._primed else self._chunks.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                self._ended = True
+                break
+            dropped = min(self._skip, len(chunk))
+            self._skip -= dropped
+            self._pending += chunk[dropped:]
+
+        if not self._pending:
+            if self._ended:
+                return None
+            # the worker is behind: keep the device fed, at most a chunk at a time, and owe the stream what it was given
+            data = bytes(self.audio_format.align(min(num_bytes, CHUNK_FRAMES * self.audio_format.bytes_per_frame)))
+            self._skip += len(data)
+            self.underruns += 1
+
+        else:
+            size = self.audio_format.align(min(num_bytes, len(self._pending)))
+            data, self._pending = self._pending[:size], self._pending[size:]
+        duration = len(data) / self.audio_format.bytes_per_second
+        audio = AudioData(data, len(data), self._timestamp, duration)
+        self._timestamp += duration
+        return audio
+
+    def seek(self, timestamp: float):
+        # RatePlayback restarts the worker instead
+        pass
+
+
+class RatePlayback:
+    """Inst and voices played at `rate` times their speed, pitch included.
+
+    A worker thread resamples both stems ahead of the audio device and mixes
+    them into BUFFERED_CHUNKS chunks of CHUNK_FRAMES frames, played by a
+    single player until the longer stem ends; the game thread only starts
+    and stops it. Stems recorded at different sample rates are mixed at the
+    highest one. `time` is the
+    song position in seconds, like a pyglet Player's `time` at normal speed,
+    so the song clock reads it the same way.
+    """
+    def __init__(self, buffers: list[PcmBuffer], rate: float, start_s: float = 0.0, volume: float = 1.0):
+        self._buffers = buffers
+        self.rate = min(max(rate, MIN_PLAYBACK_RATE), MAX_PLAYBACK_RATE)
+        self._volume = volume
+        self._worker = None
+        self._player = None
+        self._source = None
+        self._start(start_s)
+
+    def _start(self, start_s: float):
+        self._start_s = start_s
+        sample_rate = max(buffer.sample_rate for buffer in self._buffers)
+        self._worker = _ResampleWorker(self._buffers, self.rate, start_s * sample_rate)
+        self._worker.start()
+        # the first chunks are awaited here, on the game thread, so playback never opens on an underrun
+        primed = []
+        while len(primed) < PRIMED_CHUNKS and (not primed or primed[-1] is not None):
+            try:
+                primed.append(self._worker.chunks.get(timeout=CHUNK_WAIT_S))
+            except queue.Empty:
+                break
+
+        remaining = max(0.0, max(buffer.duration for buffer in self._buffers) - start_s) / self.rate
+        self._source = _ChunkSource(self._worker.chunks, self._worker.channels, sample_rate, remaining, primed)
+        self._player = pyglet.media.Player()
+        self._player.volume = self._volume
+        self._player.queue(self._source)
+        self._player.play()
+
+    @property
+    def time(self) -> float:
+        return self._start_s + self._player.time * self.rate
+
+    @property
+    def underruns(self) -> int:
+        return self._source.underruns if self._source is not None else 0
+
+    def seek(self, timestamp: float):
+        self.stop()
+        self._start(timestamp)
+
+    def stop(self):
+        if self._player is not None:
+            self._player.pause()
+            self._player.delete()
+            self._player = None
+        if self._worker is not None:
+            self._worker.stop()
+            self._worker = None
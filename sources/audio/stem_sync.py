@@ -0,0 +1,52 @@
+"""Keeps a song's separately played stems on one timeline."""
+
+SYNC_CHECK_FRAMES = 8
+DRIFT_THRESHOLD_MS = 10
+
+
+class StemSync:
+    """Compares a follower player against the leader every `check_frames` updates and pulls it back when it drifts.
+
+    A hitch or a resume can leave the two stems apart, since each pyglet
+    player keeps its own time. A drift past `threshold_ms` is corrected by
+    seeking the follower onto the leader, which PcmSource does to the sample.
+    Every measurement goes into the statistics of `report`.
+    """
+    def __init__(self, threshold_ms: float = DRIFT_THRESHOLD_MS, check_frames: int = SYNC_CHECK_FRAMES):
+        self.threshold_ms = threshold_ms
+        self._check_frames = check_frames
+        self._frame = 0
+
+        self.checks = 0
+        self.corrections = 0
+        self.worst_drift_ms = 0.0
+        self._total_drift_ms = 0.0
+
+    def reset(self):
+        """Start counting frames again; call whenever the players were recreated."""
+        self._frame = 0
+
+    def update(self, leader, follower) -> float | None:
+        """Returns the drift in ms (follower minus leader) on a frame where it was measured."""
+        self._frame += 1
+        if self._frame < self._check_frames:
+            return None
+        self._frame = 0
+
+        leader_time = leader.time
+        drift_ms = (follower.time - leader_time) * 1000
+        self.checks += 1
+        self._total_drift_ms += abs(drift_ms)
+        self.worst_drift_ms = max(self.worst_drift_ms, abs(drift_ms))
+        if abs(drift_ms) > self.threshold_ms:
+            follower.seek(leader_time)
+            self.corrections += 1
+        return drift_ms
+
+    def report(self) -> dict:
+        return {
+            "checks": self.checks,
+            "corrections": self.corrections,
+            "mean_drift_ms": self._total_drift_ms / self.checks if self.checks else 0.0,
+            "worst_drift_ms": self.worst_drift_ms,
+        }
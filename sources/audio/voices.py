@@ -0,0 +1,109 @@
+"""A fixed pool of pyglet players for short sounds, reused instead of created per sound."""
+import numpy as np
+import pyglet
+from pyglet.media.codecs.base import AudioData, AudioFormat, StreamingSource
+
+from .pcm import PcmBuffer
+
+VOICE_SAMPLE_RATE = 44100
+VOICE_CHANNELS = 2
+# an idle voice's source answers with at most this much silence per request
+SILENCE_FRAMES = 1024
+
+
+def to_voice_format(buffer: PcmBuffer) -> PcmBuffer:
+    """*buffer* as stereo at VOICE_SAMPLE_RATE, the one format every voice plays."""
+    samples = buffer.samples
+    if samples.shape[1] == 1:
+        samples = np.repeat(samples, VOICE_CHANNELS, axis=1)
+    samples = samples[:, :VOICE_CHANNELS]
+    if buffer.sample_rate != VOICE_SAMPLE_RATE:
+        frames = max(1, round(buffer.frames * VOICE_SAMPLE_RATE / buffer.sample_rate))
+        positions = np.arange(frames) * (buffer.sample_rate / VOICE_SAMPLE_RATE)
+        samples = np.stack([np.interp(positions, np.arange(buffer.frames), samples[:, channel])
+                            for channel in range(VOICE_CHANNELS)], axis=1)
+    return PcmBuffer(np.ascontiguousarray(samples, dtype=np.int16), VOICE_SAMPLE_RATE)
+
+
+def synthesize_tone(frequency: float, duration: float, decay: float, amplitude: float = 0.8) -> PcmBuffer:
+    """A sine blip that dies away exponentially with time constant *decay*, for when no sound file is configured."""
+    t = np.arange(round(duration * VOICE_SAMPLE_RATE)) / VOICE_SAMPLE_RATE
+    wave = np.sin(2 * np.pi * frequency * t) * np.exp(-t / decay) * amplitude * 32767
+    return PcmBuffer(np.repeat(wave.astype(np.int16)[:, None], VOICE_CHANNELS, axis=1), VOICE_SAMPLE_RATE)
+
+
+class _VoiceSource(StreamingSource):
+    """The one source a voice ever plays; starting a sound swaps the buffer under it."""
+    def __init__(self):
+        self.audio_format = AudioFormat(VOICE_CHANNELS, 16, VOICE_SAMPLE_RATE)
+        self.video_format = None
+        self._duration = None
+        self.buffer = None
+        self._frame = 0
+        self._silence = bytes(SILENCE_FRAMES * self.audio_format.bytes_per_frame)
+
+    @property
+    def finished(self) -> bool:
+        return self.buffer is None or self._frame >= self.buffer.frames
+
+    def seek(self, timestamp: float):
+        self._frame = max(0, round(timestamp * VOICE_SAMPLE_RATE))
+
+    def get_audio_data(self, num_bytes: int, compensation_time: float = 0.0) -> AudioData:
+        # never None: an ended source would be dropped from its player
+        frames = num_bytes // self.audio_format.bytes_per_frame
+        if self.finished:
+            data = self._silence[:min(frames, SILENCE_FRAMES) * self.audio_format.bytes_per_frame]
+        else:
+            start = self._frame
+            self._frame = min(start + frames, self.buffer.frames)
+            data = self.buffer.samples[start:self._frame].tobytes()
+        return AudioData(data, len(data))
+
+
+class VoicePool:
+    """`count` players created up front, each with its own _VoiceSource.
+
+    `play` takes the first idle voice, or steals the one started longest ago
+    when all are busy, so nothing is allocated per sound. A voice can start
+    partway into its sound, which lines a late-started sound up with the
+    time it was meant to begin at.
+    """
+    def __init__(self, count: int):
+        self._sources = [_VoiceSource() for _ in range(count)]
+        self._players = []
+        for source in self._sources:
+            player = pyglet.media.Player()
+            player.queue(source)
+            self._players.append(player)
+        self._started = [0] * count
+        self._starts = 0
+        self.stolen = 0
+
+    def play(self, buffer: PcmBuffer, volume: float = 1.0, offset: float = 0.0):
+        """Start *buffer* *offset* seconds in; a sound already past its end isn't started."""
+        if offset >= buffer.duration:
+            return
+        index = next((i for i, source in enumerate(self._sources) if source.finished), None)
+        if index is None:
+            index = min(range(len(self._sources)), key=self._started.__getitem__)
+            self.stolen += 1
+        player, source = self._players[index], self._sources[index]
+        player.pause()
+        source.buffer = buffer
+        player.seek(offset)
+        player.volume = volume
+        player.play()
+        self._starts += 1
+        self._started[index] = self._starts
+
+    def update(self):
+        """Pause voices whose sound ended, so idle voices don't keep streaming silence."""
+        for player, source in zip(self._players, self._sources):
+            if source.finished and player.playing:
+                player.pause()
+
+    def delete(self):
+        for player in self._players:
+            player.delete()
+        self._players = []
@@ -1,8 +1,15 @@
 from .background        import BackgroundManager
 from .camera            import CameraManager
+from .modchart          import ModchartManager
 from .note              import NoteManager
 from .receptor          import ReceptorManager
 from .score             import ScoreManager
 from .singer_character  import SingerCharacterManager
 from .song              import SongManager
-from .game_interface    import GameInterfaceManager
\ No newline at end of file
+from .game_interface    import GameInterfaceManager
+from .session           import GameSession
+from .sfx               import SfxManager
+from .gc_policy         import GcManager
+from .snapshot          import SnapshotManager
+from .simulation        import HeadlessSimulation
+from .replay            import Replay, ReplayRecorder
\ No newline at end of file
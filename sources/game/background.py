@@ -1,39 +1,85 @@
+import itertools
 import pathlib
 
 import arcade
+from PIL import Image
+from sources.utils import RenderLayer, StreamingAnimationSprite, load_animation_variant, load_texture_variant, pick_variant
+from .camera import BEAT_UI_CAMERA_ADD_ZOOM, max_world_zoom
+
+
+def _is_animated(sprite) -> bool:
+    return isinstance(sprite, (arcade.TextureAnimationSprite, StreamingAnimationSprite))
 
 
 class BackgroundManager:
-    def __init__(self, background_data):
+    """Stage layers, split at load time into static and animated ones.
+
+    Consecutive static screen layers are flattened into one texture. The
+    screen stack is rendered offscreen only when one of its gifs switches
+    frame and composited as a single quad otherwise.
+    """
+    def __init__(self, session, background_data):
+        self._session = session
         self.world_sprites = arcade.SpriteList()
         self.screen_sprites = arcade.SpriteList()
+        self._animated_world = []
+        self._animated_screen = []
         window = arcade.get_window()
+        world_zoom = max_world_zoom(background_data)
+        screen_zoom = (1 + BEAT_UI_CAMERA_ADD_ZOOM) * window.get_pixel_ratio()
 
+        screen_layers = []
         for bg in background_data["backgrounds"]:
-            sprite, full_screen = self._create_sprite(bg)
+            sprite, full_screen = self._create_sprite(bg, screen_zoom if bg["screen_space"] else world_zoom)
             self._scale_sprite(sprite, bg, window, full_screen)
             self._position_sprite(sprite, bg, window, full_screen)
-            target = self.screen_sprites if bg["screen_space"] else self.world_sprites
-            target.append(sprite)
+            animated = _is_animated(sprite)
+            if bg["screen_space"]:
+                screen_layers.append(sprite)
+                if animated:
+                    self._animated_screen.append(sprite)
+            else:
+                self.world_sprites.append(sprite)
+                if animated:
+                    self._animated_world.append(sprite)
+
+        for sprite in self._merge_static_runs(screen_layers, window):
+            self.screen_sprites.append(sprite)
 
-    def _create_sprite(self, bg):
+        self._screen_layer = RenderLayer(window)
+        self._screen_camera = arcade.Camera2D()
+
+    def _create_sprite(self, bg, zoom):
         path = pathlib.Path(bg["path"])
         speed = bg.get("speed", 1)
+        scale = bg["scale"]
+        # full screen layers are stretched to the window and always use the original image
+        effective_scale = 1.0 if scale == "full_screen" else scale * zoom
 
-        if path.suffix == ".gif":
-            anim = arcade.load_animated_gif(str(path)).animation
+        if path.suffix == ".gif" and bg.get("stream", False):
+            # decoded a few frames ahead on a worker thread instead of keeping every frame resident
+            variant, factor = pick_variant(path, effective_scale)
+            decode_scale = bg.get("decode_scale", 1.0)
+            sprite = StreamingAnimationSprite(variant, decode_scale=decode_scale)
+            factor *= decode_scale
+        elif path.suffix == ".gif":
+            anim, factor = load_animation_variant(path, effective_scale)
             sprite = arcade.TextureAnimationSprite()
             sprite.animation = anim
             sprite.time = 0
             sprite._current_keyframe_index = 0
             sprite._should_loop = True
+            sprite.frame_starts = list(itertools.accumulate((kf.duration for kf in anim.keyframes), initial=0))
+            sprite.next_frame_time = 0
         else:
+            texture, factor = load_texture_variant(path, effective_scale)
             sprite = arcade.Sprite()
-            sprite.texture = arcade.load_texture(str(path))
+            sprite.texture = texture
+            sprite.source_path = str(path)
 
         sprite.speed = speed
+        sprite.resolution_factor = factor
 
-        scale = bg["scale"]
         return sprite, scale == "full_screen"
 
     def _scale_sprite(self, sprite : arcade.TextureAnimationSprite, bg, window, full_screen):
@@ -41,7 +87,7 @@ class BackgroundManager:
             sprite.width = window.width
             sprite.height = window.height
         else:
-            sprite.scale = bg["scale"]
+            sprite.scale = bg["scale"] / sprite.resolution_factor
 
     def _position_sprite(self, sprite, bg, window, full_screen):
         x, y = tuple(bg.get("position", (0, 0)))
@@ -55,16 +101,69 @@ class BackgroundManager:
             sprite.center_x = window.width / 2
             sprite.center_y = window.height / 2
 
+    def _merge_static_runs(self, sprites, window):
+        """Flatten every run of two or more consecutive static screen layers into one window sized sprite."""
+        merged = []
+        for animated, run in itertools.groupby(sprites, key=_is_animated):
+            run = list(run)
+            if animated or len(run) < 2:
+                merged.extend(run)
+                continue
+
+            canvas = Image.new("RGBA", (window.width, window.height))
+            for sprite in run:
+                image = sprite.texture.image.convert("RGBA").resize((round(sprite.width), round(sprite.height)), Image.Resampling.BILINEAR)
+                layer = Image.new("RGBA", canvas.size)
+                layer.paste(image, (round(sprite.left), round(window.height - sprite.top)))
+                canvas.alpha_composite(layer)
+
+            name = "background:" + "+".join(sprite.source_path for sprite in run)
+            flat = arcade.Sprite(arcade.Texture(canvas, hash=name))
+            flat.position = (window.width / 2, window.height / 2)
+            merged.append(flat)
+        return merged
+
+    @property
+    def has_animated_world(self):
+        return bool(self._animated_world)
+
+    def on_hide_view(self):
+        for sprite in self._animated_world + self._animated_screen:
+            if isinstance(sprite, StreamingAnimationSprite):
+                sprite.close()
+
+    def _advance(self, sprite, delta_time) -> bool:
+        """Advance a gif layer; True only when it moved on to another frame."""
+        if isinstance(sprite, StreamingAnimationSprite):
+            return sprite.advance(delta_time * sprite.speed)
+
+        sprite.time += delta_time * sprite.speed
+        if sprite.time < sprite.next_frame_time:
+            return False
+
+        index, keyframe = sprite.animation.get_keyframe(sprite.time)
+        # seconds until the current keyframe ends, so the timeline isn't searched again before that
+        time_ms = sprite.time * 1000 % sprite.animation.duration_ms
+        sprite.next_frame_time = sprite.time + (sprite.frame_starts[index + 1] - time_ms) / 1000
+        if index == sprite._current_keyframe_index:
+            return False
+        sprite._current_keyframe_index = index
+        sprite.texture = keyframe.texture
+        return True
+
     def update(self, delta_time):
-        for sprite in self.world_sprites:
-            if hasattr(sprite, "update_animation"):
-                sprite.update_animation(delta_time * getattr(sprite, "speed", 1))
-        for sprite in self.screen_sprites:
-            if hasattr(sprite, "update_animation"):
-                sprite.update_animation(delta_time * getattr(sprite, "speed", 1))
+        for sprite in self._animated_world:
+            self._advance(sprite, delta_time)
+        for sprite in self._animated_screen:
+            if self._advance(sprite, delta_time):
+                self._screen_layer.invalidate()
 
     def draw_world(self):
         self.world_sprites.draw()
 
     def draw_camera(self):
-        self.screen_sprites.draw()
\ No newline at end of file
+        """Composite the screen stack; called under the UI camera, whose zoom scales the cached layer."""
+        if self._screen_layer.dirty:
+            with self._screen_layer.render(), self._screen_camera.activate():
+                self.screen_sprites.draw()
+        self._screen_layer.draw(self._session.camera_mgr.camera_ui.zoom)
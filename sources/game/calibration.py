@@ -0,0 +1,54 @@
+import json
+
+import numpy as np
+
+from sources.audio import PcmBuffer
+from sources.audio.voices import VOICE_CHANNELS, VOICE_SAMPLE_RATE, synthesize_tone
+
+OFFSETS_PATH = "assets/config/offsets.json"
+CALIBRATION_BPM = 100
+# the share of taps cut from each end before averaging, so a few stray taps don't move the result
+TRIM_FRACTION = 0.2
+
+
+def load_offsets(path=OFFSETS_PATH) -> dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def save_offsets(offsets: dict, path=OFFSETS_PATH):
+    with open(path, 'w') as file:
+        json.dump(offsets, file, indent=4)
+
+
+def metronome_track(bpm: float, beats: int) -> PcmBuffer:
+    """*beats* clicks at *bpm*, the first of every four accented, rendered as one buffer to play with one player."""
+    interval = round(VOICE_SAMPLE_RATE * 60 / bpm)
+    samples = np.zeros((interval * beats, VOICE_CHANNELS), dtype=np.int16)
+    accent = synthesize_tone(1500, 0.05, 0.012).samples
+    click = synthesize_tone(1000, 0.05, 0.012).samples
+    for beat in range(beats):
+        tone = accent if beat % 4 == 0 else click
+        samples[beat * interval:beat * interval + len(tone)] = tone
+    return PcmBuffer(samples, VOICE_SAMPLE_RATE)
+
+
+def tap_error(tap_ms: float, beat_ms: float) -> float:
+    """How late a tap at *tap_ms* is against the nearest beat of a metronome ticking every *beat_ms*."""
+    return tap_ms - round(tap_ms / beat_ms) * beat_ms
+
+
+def robust_offset(errors, trim: float = TRIM_FRACTION) -> dict:
+    """Median and trimmed mean of tap errors, plus their median absolute deviation as the spread."""
+    errors = np.sort(np.asarray(errors, dtype=float))
+    if not len(errors):
+        return {"taps": 0, "median_ms": 0.0, "trimmed_mean_ms": 0.0, "spread_ms": 0.0}
+    cut = int(len(errors) * trim)
+    kept = errors[cut:len(errors) - cut] if len(errors) > 2 * cut else errors
+    median = float(np.median(errors))
+    return {
+        "taps": len(errors),
+        "median_ms": median,
+        "trimmed_mean_ms": float(kept.mean()),
+        "spread_ms": float(np.median(np.abs(errors - median))),
+    }
@@ -1,12 +1,20 @@
 import arcade
-from sources.utils import *
 
 BEAT_UI_CAMERA_ADD_ZOOM = 0.1
 BEAT_NOTE_CAMERA_ADD_ZOOM = 0.15
 BEAT_WORLD_CAMERA_ADD_ZOOM = 0.15
+# eased values this close to their target are snapped onto it, so a settled camera stops changing
+SETTLE_POSITION = 0.01
+SETTLE_ZOOM = 1e-4
+
+def max_world_zoom(background_data : dict) -> float:
+    """Largest zoom the world camera reaches, beat bumps included, in framebuffer pixels per world unit."""
+    return (background_data["default_zoom"] + BEAT_WORLD_CAMERA_ADD_ZOOM) * arcade.get_window().get_pixel_ratio()
 
 class CameraManager:
-    def __init__(self, song_data : dict, background_data : dict):
+    def __init__(self, session, song_data : dict, background_data : dict):
+        self._session = session
+        self._bus = session.bus
         self.camera_world = arcade.Camera2D()
         self.camera_note = arcade.Camera2D()
         self.camera_ui = arcade.Camera2D()
@@ -15,20 +23,47 @@ class CameraManager:
         self.camera_world.zoom = self._spawn_camera_world_zoom
 
         self._camera_target_position = arcade.Vec2()
-        bus.subscribe("beat", self._beat)
-        bus.subscribe("player_pressed", self._note_pressed)
-        bus.subscribe("opponent_pressed", self._note_pressed)
+        self._player_focus = False
+        # set whenever camera_world moved or zoomed since the world layer was last drawn; the view clears it
+        self.world_dirty = True
+        self._world_state = self._current_world_state()
+        self._bus.subscribe("beat", self._beat)
+        self._bus.subscribe("player_pressed", self._note_pressed)
+        self._bus.subscribe("opponent_pressed", self._note_pressed)
+        self._bus.subscribe("chart_event:focus", self._focus)
+        self._bus.subscribe("chart_event:camera_zoom", self._camera_zoom)
 
     def on_hide_view(self):
-        bus.unsubscribe("beat", self._beat)
-        bus.unsubscribe("player_pressed", self._note_pressed)
-        bus.unsubscribe("opponent_pressed", self._note_pressed)
+        self._bus.unsubscribe("beat", self._beat)
+        self._bus.unsubscribe("player_pressed", self._note_pressed)
+        self._bus.unsubscribe("opponent_pressed", self._note_pressed)
+        self._bus.unsubscribe("chart_event:focus", self._focus)
+        self._bus.unsubscribe("chart_event:camera_zoom", self._camera_zoom)
 
-    def _note_pressed(self, direction_index, note):
-        from sources.views import MainGameView
-        character_mgr = MainGameView.current.character_mgr
-        song_mgr = MainGameView.current.song_mgr
+    def snapshot(self) -> tuple:
+        return (tuple(self._camera_target_position), self._player_focus, tuple(self.camera_world.position),
+                self.camera_world.zoom, self.camera_note.zoom, self.camera_ui.zoom)
+
+    def restore(self, state: tuple):
+        target, self._player_focus, world_position, world_zoom, note_zoom, ui_zoom = state
+        self._camera_target_position = arcade.Vec2(*target)
+        self.camera_world.position = world_position
+        self.camera_world.zoom, self.camera_note.zoom, self.camera_ui.zoom = world_zoom, note_zoom, ui_zoom
+
+    def _focus(self, time, must_hit):
+        self._player_focus = must_hit
+
+    def _camera_zoom(self, time, world=BEAT_WORLD_CAMERA_ADD_ZOOM, ui=BEAT_UI_CAMERA_ADD_ZOOM, note=BEAT_NOTE_CAMERA_ADD_ZOOM):
+        """Chart-placed zoom bump, eased back by update like the per-beat one.
 
+        update caps every camera at its beat bump (stage textures are picked for that zoom), so larger amounts are cut back.
+        """
+        self.camera_world.zoom = self._spawn_camera_world_zoom + world
+        self.camera_ui.zoom = 1 + ui
+        self.camera_note.zoom = 1 + note
+
+    def _note_pressed(self, direction_index, note):
+        character_mgr = self._session.character_mgr
 
         if direction_index < 3:
             if note is not None:
@@ -36,32 +71,42 @@ class CameraManager:
                     amount = 85
                 else:
                     amount = 50
-                self._camera_target_position = character_mgr.player.camera_position if song_mgr.is_player_turn else character_mgr.opponent.camera_position
+                self._camera_target_position = character_mgr.player.camera_position if self._player_focus else character_mgr.opponent.camera_position
                 self._camera_target_position += [arcade.Vec2(-amount, 0), arcade.Vec2(0, -amount), arcade.Vec2(0, amount), arcade.Vec2(amount, 0)][direction_index % 4]
         else:
             if character_mgr.opponent.current_animation_name in ["sing_left_alt", "sing_down_alt", "sing_up_alt", "sing_right_alt"]:
                 amount = 85
             else:
                 amount = 50
-            self._camera_target_position = character_mgr.player.camera_position if song_mgr.is_player_turn else character_mgr.opponent.camera_position
+            self._camera_target_position = character_mgr.player.camera_position if self._player_focus else character_mgr.opponent.camera_position
             self._camera_target_position += [arcade.Vec2(-amount, 0), arcade.Vec2(0, -amount), arcade.Vec2(0, amount), arcade.Vec2(amount, 0)][direction_index % 4]
         
     def _beat(self, beat, time):
-        from sources.views import MainGameView
-        character_mgr = MainGameView.current.character_mgr
-        song_mgr = MainGameView.current.song_mgr
+        character_mgr = self._session.character_mgr
 
-        self.camera_target_position = character_mgr.player.camera_position if song_mgr.is_player_turn else character_mgr.opponent.camera_position
+        self.camera_target_position = character_mgr.player.camera_position if self._player_focus else character_mgr.opponent.camera_position
 
         self.camera_ui.zoom = 1 + BEAT_UI_CAMERA_ADD_ZOOM
         self.camera_note.zoom = 1 + BEAT_NOTE_CAMERA_ADD_ZOOM
         self.camera_world.zoom = self._spawn_camera_world_zoom + BEAT_WORLD_CAMERA_ADD_ZOOM
 
+    def _current_world_state(self) -> tuple:
+        return (*self.camera_world.position, self.camera_world.zoom)
+
     def update(self, delta_time):
-        self.camera_world.position = self.camera_world.position.lerp(
-            self._camera_target_position,
-            delta_time * 5)
+        position = self.camera_world.position.lerp(self._camera_target_position, delta_time * 5)
+        if position.distance(self._camera_target_position) < SETTLE_POSITION:
+            position = self._camera_target_position
+        self.camera_world.position = position
     
         self.camera_world.zoom = min(arcade.math.lerp(self.camera_world.zoom, self._spawn_camera_world_zoom, delta_time), self._spawn_camera_world_zoom + BEAT_WORLD_CAMERA_ADD_ZOOM)
+        if abs(self.camera_world.zoom - self._spawn_camera_world_zoom) < SETTLE_ZOOM:
+            self.camera_world.zoom = self._spawn_camera_world_zoom
         self.camera_note.zoom = min(arcade.math.lerp(self.camera_note.zoom, 1, delta_time), 1 + BEAT_NOTE_CAMERA_ADD_ZOOM)
-        self.camera_ui.zoom = min(arcade.math.lerp(self.camera_ui.zoom, 1, delta_time * 10), 1 + BEAT_UI_CAMERA_ADD_ZOOM)
\ No newline at end of file
+        self.camera_ui.zoom = min(arcade.math.lerp(self.camera_ui.zoom, 1, delta_time * 10), 1 + BEAT_UI_CAMERA_ADD_ZOOM)
+
+        # compared against the last update, which also catches beats, events and restores in between
+        world_state = self._current_world_state()
+        if world_state != self._world_state:
+            self._world_state = world_state
+            self.world_dirty = True
\ No newline at end of file
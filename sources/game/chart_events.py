@@ -0,0 +1,114 @@
+import bisect
+
+PREFETCH_LEAD_MS = 3000
+# events that set a lasting state rather than doing something once; a seek publishes the latest of each again,
+# one per value of the named param for types that keep a state per target
+STATE_EVENT_TYPES = {"focus": None, "alt_animation": None, "character_swap": "role"}
+# character_swap roles and the song data key naming who is on stage there before any swap
+CHARACTER_ROLES = {"player": "player_name", "opponent": "opponent_name", "sub_character": "sub_character_name"}
+
+
+class ChartEventTimeline:
+    """Every chart-side effect in one time-sorted track, fired by a cursor from the song tick.
+
+    The chart's `events` is a list of `{"time": ms, "type": name, ...params}`.
+    Section flags are compiled into the same track, so nothing has to scan
+    sections at runtime:
+
+    - focus (must_hit): the camera side changes, fired at every section whose mustHitSection flips
+    - alt_animation (enabled): altAnim turns on or off
+
+    Chart events with a type of their own include character_swap (role,
+    name). Every role the chart swaps also gets a swap to its starting
+    character at 0 ms, so a seek back before its first swap puts it back.
+
+    An event is published on the session bus as `chart_event:<type>` with
+    `time` and its params, so handlers register by type with `bus.subscribe`.
+    `PREFETCH_LEAD_MS` before that, `chart_prefetch:<type>` is published with
+    the same arguments for handlers that need to load assets ahead of time.
+    """
+    def __init__(self, bus, song_data: dict, sections: list):
+        self._bus = bus
+        events = [(float(e["time"]), e["type"], {k: v for k, v in e.items() if k not in ("time", "type")})
+                  for e in song_data.get("events", [])]
+        events = self._starting_characters(song_data, events) + events
+        events += self._section_events(sections)
+        # stable, so events sharing a time fire in chart order
+        events.sort(key=lambda event: event[0])
+
+        self.times = [time for time, _, _ in events]
+        self.types = [event_type for _, event_type, _ in events]
+        self.params = [params for _, _, params in events]
+        self._cursor = 0
+        self._prefetch_cursor = 0
+        self._state_keys = {self._state_key(index) for index in range(len(events))} - {None}
+
+    @staticmethod
+    def _starting_characters(song_data: dict, events: list) -> list:
+        swapped = {params["role"] for _, event_type, params in events if event_type == "character_swap"}
+        return [(0.0, "character_swap", {"role": role, "name": song_data[CHARACTER_ROLES[role]]})
+                for role in CHARACTER_ROLES if role in swapped]
+
+    def _state_key(self, index: int):
+        event_type = self.types[index]
+        if event_type not in STATE_EVENT_TYPES:
+            return None
+        param = STATE_EVENT_TYPES[event_type]
+        return event_type, self.params[index][param] if param is not None else None
+
+    @staticmethod
+    def _section_events(sections: list) -> list:
+        events = []
+        # the first section always sets both, so a seek back to it resets them
+        must_hit, alt_animation = None, None
+        for section in sections:
+            if section.must_hit != must_hit:
+                must_hit = section.must_hit
+                events.append((section.start, "focus", {"must_hit": must_hit}))
+            if section.alt_animation != alt_animation:
+                alt_animation = section.alt_animation
+                events.append((section.start, "alt_animation", {"enabled": alt_animation}))
+        return events
+
+    def __len__(self):
+        return len(self.times)
+
+    def reset(self):
+        self._cursor = 0
+        self._prefetch_cursor = 0
+
+    def seek(self, song_ms: float):
+        """Move the cursors to *song_ms* without replaying what lies before it.
+
+        Only the latest event of each STATE_EVENT_TYPES type (and target) is
+        published again, and prefetches for events just ahead are requested.
+        """
+        self._cursor = bisect.bisect_right(self.times, song_ms)
+        prefetch_cursor = bisect.bisect_right(self.times, song_ms + PREFETCH_LEAD_MS)
+
+        latest = {}
+        for index in range(self._cursor - 1, -1, -1):
+            key = self._state_key(index)
+            if key is not None and key not in latest:
+                latest[key] = index
+                if len(latest) == len(self._state_keys):
+                    break
+        for index in sorted(latest.values()):
+            self._bus.publish(f"chart_event:{self.types[index]}", time=self.times[index], **self.params[index])
+
+        for index in range(self._cursor, prefetch_cursor):
+            self._bus.publish(f"chart_prefetch:{self.types[index]}", time=self.times[index], **self.params[index])
+        self._prefetch_cursor = prefetch_cursor
+
+    def update(self, song_ms: float):
+        """Publish the prefetches and events that became due; costs nothing when none did."""
+        times = self.times
+        while self._prefetch_cursor < len(times) and times[self._prefetch_cursor] <= song_ms + PREFETCH_LEAD_MS:
+            index = self._prefetch_cursor
+            self._prefetch_cursor += 1
+            self._bus.publish(f"chart_prefetch:{self.types[index]}", time=times[index], **self.params[index])
+
+        while self._cursor < len(times) and times[self._cursor] <= song_ms:
+            index = self._cursor
+            self._cursor += 1
+            self._bus.publish(f"chart_event:{self.types[index]}", time=times[index], **self.params[index])
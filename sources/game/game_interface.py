@@ -1,6 +1,6 @@
 import math
 import arcade
-from sources.utils import *
+from sources.utils import BitmapText, RenderLayer, load_bitmap_font, load_texture
 
 BAR_WIDTH = 400
 BAR_HEIGHT = 10
@@ -9,35 +9,51 @@ NAME_Y = 40
 TIME_Y = 65
 NAME_FONT_SIZE = 18
 TIME_FONT_SIZE = 14
+SCORE_FONT_SIZE = 12
+JUDGEMENT_FONT_SIZE = 24
+HUD_FONT_NAME = "Paperlogy 8"
 
 class TimebarInterface:
-    def __init__(self, song_name):
+    def __init__(self, session, song_name):
+        self._session = session
         self._time_bar_bg = arcade.SpriteSolidColor(BAR_WIDTH, BAR_HEIGHT, arcade.get_window().width/2, arcade.get_window().height - BAR_Y, arcade.color.BLACK)
         self._time_bar_fg = arcade.SpriteSolidColor(BAR_WIDTH-2, BAR_HEIGHT-2, arcade.get_window().width/2, arcade.get_window().height - BAR_Y, arcade.color.WHITE)
         
         self._time_bar_name_text = arcade.Text(f"< {song_name} >", arcade.get_window().width/2, arcade.get_window().height - NAME_Y,
                                             arcade.color.WHITE, NAME_FONT_SIZE, font_name="Paperlogy 8", align="center", anchor_x="center", anchor_y="center")
-        self._time_bar_time_text = arcade.Text("| 0:00 |", arcade.get_window().width/2, arcade.get_window().height - TIME_Y,
-                                            arcade.color.WHITE, TIME_FONT_SIZE, font_name="Paperlogy 8", align="center", anchor_x="center", anchor_y="center")
+        time_font = load_bitmap_font(HUD_FONT_NAME, TIME_FONT_SIZE, charset="0123456789:| ")
+        self._time_bar_time_text = BitmapText(time_font, "| 0:00 |", arcade.get_window().width/2, arcade.get_window().height - TIME_Y,
+                                              anchor_x="center", anchor_y="center")
 
         self._bar_sprites = arcade.SpriteList()
         self._bar_sprites.append(self._time_bar_bg)
         self._bar_sprites.append(self._time_bar_fg)
 
+        self._shown_second = 0
+        self.dirty = True
+
     def _update_bar_length(self, delta_time):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+        song_mgr = self._session.song_mgr
 
-        if song_mgr.inst_player.source is not None:
-            ratio = song_mgr.inst_player.time / song_mgr.inst_player.source.duration
-            self._time_bar_fg.width = self._time_bar_bg.width * ratio
+        duration_ms = song_mgr.duration_ms
+        if duration_ms > 0:
+            ratio = min(max(song_mgr.song_ms / duration_ms, 0.0), 1.0)
+            # whole pixels only, the bar is redrawn when it visibly grows
+            width = math.floor(self._time_bar_bg.width * ratio)
+            if width != self._time_bar_fg.width:
+                self._time_bar_fg.width = width
+                self.dirty = True
 
     def _update_time_text(self):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
-        
-        minutes, seconds = divmod(song_mgr.inst_player.time, 60)
-        self._time_bar_time_text.text = f"| {math.floor(minutes)}:{math.floor(seconds):02d} |"
+        song_mgr = self._session.song_mgr
+
+        second = max(0, math.floor(song_mgr.song_ms / 1000))
+        if second == self._shown_second:
+            return
+        self._shown_second = second
+        minutes, seconds = divmod(second, 60)
+        self._time_bar_time_text.text = f"| {minutes}:{seconds:02d} |"
+        self.dirty = True
 
     def update(self, delta_time):
         self._update_bar_length(delta_time)
@@ -49,62 +65,81 @@ class TimebarInterface:
         self._time_bar_time_text.draw()
 
 class ScoreInterface:
-    def __init__(self):
-        self._score_text    = arcade.Text("Score : 0", 400, 25, arcade.color.WHITE, font_name="Paperlogy 8")
-        self._accuracy_text = arcade.Text("Accuracy : 100%", 400, 5, arcade.color.WHITE, font_name="Paperlogy 8")
+    def __init__(self, session):
+        self._session = session
+        self._bus = session.bus
+        score_font = load_bitmap_font(HUD_FONT_NAME, SCORE_FONT_SIZE, charset="0123456789-:% ScoreAcuy")
+        self._score_text    = BitmapText(score_font, "Score : 0", 400, 25)
+        self._accuracy_text = BitmapText(score_font, "Accuracy : 100%", 400, 5)
         self._bot_play_text = arcade.Text("[ BOT PLAY ENABLED ]", arcade.get_window().width/2, arcade.get_window().height - 120, arcade.color.RED, font_name="Paperlogy 8", anchor_x="center", anchor_y="center", align="center", font_size=20)
 
-        bus.subscribe("score_updated", self._score_updated)
+        self.dirty = True
+
+        self._bus.subscribe("score_updated", self._score_updated)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("score_updated", self._score_updated)
 
     def _score_updated(self, score, accuracy):
         self._score_text.text       = f"Score : {score}"
         self._accuracy_text.text    = f"Accuracy : {math.floor(accuracy):02d}%"
+        self.dirty = True
 
     def draw(self):
-        from sources.views import MainGameView
-
         self._score_text.draw()
         self._accuracy_text.draw()
-        if MainGameView.current.note_mgr.is_bot_play:
+        if self._session.note_mgr.is_bot_play:
             self._bot_play_text.draw()
 
 class HealthInterface:
-    def __init__(self, song_data):
+    def __init__(self, session, song_data):
+        self._session = session
+        self._bus = session.bus
         self.bg                     = arcade.SpriteSolidColor(500, 30, arcade.get_window().width/2, 60, arcade.color.BLACK)
         self._player_health_bar     = arcade.SpriteSolidColor(490, 20, arcade.get_window().width/2, 60, arcade.color.GREEN)
         self._opponent_health_bar   = arcade.SpriteSolidColor(490, 20, arcade.get_window().width/2, 60, arcade.color.RED)
 
         self._icons = {
             "opponent": {
-                "normal": arcade.load_texture(f"assets/characters/{song_data['opponent_name']}/normal.png"),
-                "defeat": arcade.load_texture(f"assets/characters/{song_data['opponent_name']}/defeat.png"),
-                "win": arcade.load_texture(f"assets/characters/{song_data['opponent_name']}/win.png")
+                "normal": load_texture(f"assets/characters/{song_data['opponent_name']}/normal.png"),
+                "defeat": load_texture(f"assets/characters/{song_data['opponent_name']}/defeat.png"),
+                "win": load_texture(f"assets/characters/{song_data['opponent_name']}/win.png")
             },
             "player": {
-                "normal": arcade.load_texture(f"assets/characters/{song_data['player_name']}/normal.png"),
-                "defeat": arcade.load_texture(f"assets/characters/{song_data['player_name']}/defeat.png"),
-                "win": arcade.load_texture(f"assets/characters/{song_data['player_name']}/win.png")
+                "normal": load_texture(f"assets/characters/{song_data['player_name']}/normal.png"),
+                "defeat": load_texture(f"assets/characters/{song_data['player_name']}/defeat.png"),
+                "win": load_texture(f"assets/characters/{song_data['player_name']}/win.png")
             }
         }
         
         self._opponent_icon = arcade.Sprite(self._icons["opponent"]["normal"])
         self._player_icon   = arcade.Sprite(self._icons["player"]["normal"])
         
-        self._sprites = arcade.SpriteList()
-        self._sprites.append(self.bg)
-        self._sprites.append(self._opponent_health_bar)
-        self._sprites.append(self._player_health_bar)
-        self._sprites.append(self._opponent_icon)
-        self._sprites.append(self._player_icon)
+        # bars only change with health and are cached in the HUD layer, icons bounce every beat
+        self._bar_sprites = arcade.SpriteList()
+        self._bar_sprites.append(self.bg)
+        self._bar_sprites.append(self._opponent_health_bar)
+        self._bar_sprites.append(self._player_health_bar)
+
+        self._icon_sprites = arcade.SpriteList()
+        self._icon_sprites.append(self._opponent_icon)
+        self._icon_sprites.append(self._player_icon)
 
         self._health = 50.0
+        self._layout_bars()
+
+        self._bus.subscribe("score_updated", self._score_updated)
+        self._bus.subscribe("beat", self._beat)
 
-        bus.subscribe("score_updated", self._score_updated)
-        bus.subscribe("beat", self._beat)
+    def on_hide_view(self):
+        self._bus.unsubscribe("score_updated", self._score_updated)
+        self._bus.unsubscribe("beat", self._beat)
 
     def _score_updated(self, score, accuracy):
-        from sources.views import MainGameView
-        self._health = MainGameView.current.score_mgr._health
+        health = self._session.score_mgr.health
+        if health != self._health:
+            self._health = health
+            self._layout_bars()
         self._update_icon()
     
     def _beat(self, beat, time):
@@ -128,14 +163,16 @@ class HealthInterface:
         else:
             self._opponent_icon.texture = self._icons["opponent"]["normal"]
 
-    def update(self, delta_time):
+    def _layout_bars(self):
         health_ratio = self._health / 100.0
-        
-        usable_width = self.bg.width - 10 
-        
+
+        usable_width = self.bg.width - 10
+
         self._player_health_bar.width = usable_width * health_ratio
         self._player_health_bar.right = self.bg.right - 5
-        
+        self.dirty = True
+
+    def update(self, delta_time):
         icon_x = self._player_health_bar.left
         
         self._opponent_icon.center_x = icon_x - 40
@@ -147,26 +184,37 @@ class HealthInterface:
         self._player_icon.scale = min(arcade.math.lerp_2d(self._player_icon.scale, arcade.Vec2(0.75, 0.75), delta_time * 10), arcade.Vec2(1, 1))
 
     def draw(self):
-        self._sprites.draw()
+        self._bar_sprites.draw()
+
+    def draw_icons(self):
+        self._icon_sprites.draw()
 
 class JudgementInterface:
-    def __init__(self):
+    def __init__(self, session):
+        self._bus = session.bus
+        self._font = load_bitmap_font(HUD_FONT_NAME, JUDGEMENT_FONT_SIZE, bold=True,
+                                      labels=[name.upper() for name in [*session.note_mgr.judgement_windows, "auto"]])
         self._judgement_sprite = None
         self._prev_judgement = None
 
         self._sprite_list = arcade.SpriteList()
 
-        bus.subscribe("player_pressed", self._player_pressed)
+        self._bus.subscribe("player_pressed", self._player_pressed)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("player_pressed", self._player_pressed)
 
     def _player_pressed(self, direction_index, note):
         if note is None:
             return
-        if not note.judgement == self._prev_judgement:
-            self._sprite_list.clear()
-            self._judgement_sprite = arcade.create_text_sprite(note.judgement.upper(), arcade.color.WHITE, width=350, font_size=24, font_name="Paperlogy 8", bold=True, anchor_x="center", align="center", background_color=arcade.color.TRANSPARENT_BLACK)
+        label = self._font.label(note.judgement.upper())
+        if self._judgement_sprite is None:
+            self._judgement_sprite = arcade.Sprite(label)
             self._sprite_list.append(self._judgement_sprite)
-            self._judgement_sprite.position = (arcade.get_window().width / 2, arcade.get_window().height - 100)
-    
+        elif not note.judgement == self._prev_judgement:
+            self._judgement_sprite.texture = label
+        self._judgement_sprite.position = (arcade.get_window().width / 2, arcade.get_window().height - 100)
+
         self._judgement_sprite.scale = 1.5
         self._prev_judgement = note.judgement
 
@@ -178,23 +226,46 @@ class JudgementInterface:
         self._sprite_list.draw()
 
 class GameInterfaceManager:
-    def __init__(self, song_data):
+    def __init__(self, session, song_data):
         self._data = song_data
         self._sprites = arcade.SpriteList()
-        self._sprites.append(arcade.Sprite(arcade.load_texture("assets/ui/general/center_vignette.png"), scale=2, center_x=arcade.get_window().width/2, center_y=arcade.get_window().height/2))
-        self._timebar = TimebarInterface(song_data["name"])
-        self._score = ScoreInterface()
-        self._health = HealthInterface(song_data)
-        self._judgement = JudgementInterface()
+        self._sprites.append(arcade.Sprite(load_texture("assets/ui/general/center_vignette.png"), scale=2, center_x=arcade.get_window().width/2, center_y=arcade.get_window().height/2))
+        self._timebar = TimebarInterface(session, song_data["name"])
+        self._score = ScoreInterface(session)
+        self._health = HealthInterface(session, song_data)
+        self._judgement = JudgementInterface(session)
+
+        self._session = session
+        self._layer = RenderLayer()
+        self._layer_camera = arcade.Camera2D()
+        self._cached = (self._timebar, self._health, self._score)
+
+    def on_hide_view(self):
+        self._score.on_hide_view()
+        self._health.on_hide_view()
+        self._judgement.on_hide_view()
 
     def update(self, delta_time):
         self._timebar.update(delta_time)
         self._health.update(delta_time)
         self._judgement.update(delta_time)
 
+    def _render_layer(self):
+        with self._layer.render(), self._layer_camera.activate():
+            self._sprites.draw()
+            self._timebar.draw()
+            self._health.draw()
+            self._score.draw()
+        for widget in self._cached:
+            widget.dirty = False
+
     def draw(self):
-        self._sprites.draw()
-        self._timebar.draw()
-        self._health.draw()
-        self._score.draw()
+        """Composite the cached HUD and draw the parts that animate every frame on top.
+
+        Called under the UI camera; the layer is rendered unzoomed and scaled by the camera zoom instead.
+        """
+        if self._layer.dirty or any(widget.dirty for widget in self._cached):
+            self._render_layer()
+        self._layer.draw(self._session.camera_mgr.camera_ui.zoom)
+        self._health.draw_icons()
         self._judgement.draw()
\ No newline at end of file
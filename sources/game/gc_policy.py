@@ -0,0 +1,95 @@
+import bisect
+import gc
+import time
+
+import numpy as np
+
+# automatic full collections effectively never run during a song; safe windows take their place
+PLAY_GEN2_THRESHOLD = 1_000_000
+DEFAULT_SAFE_GAP_MS = 1500
+# kept clear on both sides of a window, so a collection never lands on a note being judged
+SAFE_WINDOW_MARGIN_MS = 250
+
+
+class GcManager:
+    """Keeps the cyclic garbage collector away from the frames the player is playing in.
+
+    Once the chart is loaded, everything alive is collected and frozen, so
+    no later collection walks the loaded assets again. During the song the
+    automatic full collection is held off and instead runs in safe windows:
+    stretches of at least `safe_gap_ms` without a player note, such as the
+    opponent's sections and breaks, found from the chart up front. Young
+    generations keep their usual thresholds; after the freeze they only see
+    the notes and segments made since. `assets/config/gc.json` turns the
+    whole policy off with `enabled`.
+    """
+    def __init__(self, session, gc_data: dict):
+        self._session = session
+        self._bus = session.bus
+        self.enabled = gc_data.get("enabled", True)
+        self._saved_threshold = gc.get_threshold()
+        self._window_starts, self._window_ends = self._safe_windows(gc_data.get("safe_gap_ms", DEFAULT_SAFE_GAP_MS))
+        self._last_window = -1
+
+        self.safe_collections = 0
+        self.safe_collect_ms = 0.0
+        self.worst_safe_collect_ms = 0.0
+
+        if self.enabled:
+            gc.collect()
+            gc.freeze()
+            gen0, gen1, _ = self._saved_threshold
+            gc.set_threshold(gen0, gen1, PLAY_GEN2_THRESHOLD)
+
+        self._bus.subscribe("seeked", self._seeked)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("seeked", self._seeked)
+        if self.enabled:
+            gc.set_threshold(*self._saved_threshold)
+            gc.unfreeze()
+
+    def _safe_windows(self, safe_gap_ms: float) -> tuple[list, list]:
+        note_mgr = self._session.note_mgr
+        chart = note_mgr.chart
+        player = chart.direction_index < 4
+        starts = chart.strum_time[player]
+        ends = starts + chart.sustain_length[player]
+        margin = note_mgr.hit_window_ms + SAFE_WINDOW_MARGIN_MS
+        # a gap runs from the latest end so far to the next note's start
+        gap_starts = np.concatenate(([-np.inf], np.maximum.accumulate(ends))) + margin
+        gap_ends = np.concatenate((starts, [np.inf])) - margin
+        safe = gap_ends - gap_starts >= safe_gap_ms - 2 * margin
+        return gap_starts[safe].tolist(), gap_ends[safe].tolist()
+
+    @property
+    def safe_windows(self) -> list[tuple[float, float]]:
+        return list(zip(self._window_starts, self._window_ends))
+
+    def _seeked(self, song_ms):
+        # landing in a window collects again, whichever it was
+        self._last_window = -1
+
+    def update(self, song_ms: float):
+        """Runs a full collection the first time the song enters each safe window."""
+        if not self.enabled:
+            return
+        index = bisect.bisect_right(self._window_starts, song_ms) - 1
+        if index < 0 or index == self._last_window or song_ms >= self._window_ends[index]:
+            return
+        self._last_window = index
+        start = time.perf_counter()
+        gc.collect()
+        duration_ms = (time.perf_counter() - start) * 1000
+        self.safe_collections += 1
+        self.safe_collect_ms += duration_ms
+        self.worst_safe_collect_ms = max(self.worst_safe_collect_ms, duration_ms)
+
+    def report(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "safe_windows": len(self._window_starts),
+            "safe_collections": self.safe_collections,
+            "safe_collect_ms": self.safe_collect_ms,
+            "worst_safe_collect_ms": self.worst_safe_collect_ms,
+        }
@@ -0,0 +1,128 @@
+import arcade
+import numpy as np
+
+MODIFIER_TYPES = ("drunk", "tipsy", "rotate", "reverse")
+LANE_COUNT = 8
+# radians the drunk wave advances over a window height of scroll distance
+DRUNK_PHASE_PER_SCREEN = 10
+# reverse=0.5 would stack every note on its receptor, so the spawn lookahead stops growing at this factor
+MIN_SCROLL_FACTOR = 0.1
+
+
+def _lanes(value) -> list[int]:
+    if value is None or value == "all":
+        return list(range(LANE_COUNT))
+    if value == "player":
+        return [0, 1, 2, 3]
+    if value == "opponent":
+        return [4, 5, 6, 7]
+    return [int(lane) for lane in value]
+
+
+def _value_at(points: list, time: float) -> tuple[int, float]:
+    """Index of the last keyframe at or before *time* and the curve's value there; *points* is sorted by time."""
+    index = len(points) - 1
+    while index > 0 and points[index][0] > time:
+        index -= 1
+    t0, v0 = points[index]
+    if index + 1 == len(points):
+        return index, v0
+    t1, v1 = points[index + 1]
+    return index, v0 + (v1 - v0) * (time - t0) / (t1 - t0)
+
+
+class ModchartManager:
+    """Chart-scheduled modifiers that move receptors and bend note paths.
+
+    The chart's `modifiers` is a list of
+    `{"time": ms, "type": "drunk", "amount": 1.0, "duration": ms, "lanes": "player"}`;
+    each event eases the modifier's amount on those lanes linearly from its
+    previous value to `amount` over `duration` (0 = instant). An event that
+    starts while another on the same modifier and lane is still easing cuts
+    it off: the later one wins from its start time, easing from wherever the
+    earlier one had got to.
+
+    - drunk: lanes sway sideways, notes along a wave that travels with scroll distance
+    - tipsy: lanes bob up and down
+    - rotate: degrees added to the lane angle, notes come in along the rotated lane
+    - reverse: 0..1, moves the receptors to the mirrored height and flips the scroll
+
+    Amounts are interpolated for all lanes at once and every formula is a
+    NumPy expression over lane (receptors) or sprite (notes) arrays.
+    """
+    def __init__(self, session, song_data: dict):
+        self._session = session
+        self._bus = session.bus
+        self._curves = self._compile(song_data.get("modifiers", []))
+
+        receptors = session.receptor_mgr.receptors
+        self._spawn_x = np.array([r.spawn_x for r in receptors], dtype=float)
+        self._spawn_y = np.array([r.spawn_y for r in receptors], dtype=float)
+        self._spawn_angle = np.array([r.angle for r in receptors], dtype=float)
+        self._lane_size = np.array([r.width for r in receptors], dtype=float)
+        self._column = np.arange(LANE_COUNT) % 4
+
+        self._time = 0.0
+        self.amounts = {name: np.zeros(LANE_COUNT) for name in MODIFIER_TYPES}
+        self.scroll_factor = np.ones(LANE_COUNT)
+
+    @staticmethod
+    def _compile(events) -> dict:
+        """Keyframe arrays per modifier type and lane, ready for np.interp."""
+        keyframes = {}
+        # stable, so of two events starting together the one listed later wins
+        for event in sorted(events, key=lambda e: e["time"]):
+            if event["type"] not in MODIFIER_TYPES:
+                raise ValueError(f"unknown modifier {event['type']!r}, expected one of {MODIFIER_TYPES}")
+            start = float(event["time"])
+            end = start + float(event.get("duration", 0))
+            for lane in _lanes(event.get("lanes")):
+                points = keyframes.setdefault(event["type"], {}).setdefault(lane, [(start, 0.0)])
+                index, value = _value_at(points, start)
+                # whatever an earlier event had planned past this start is overridden
+                del points[index + 1:]
+                points.append((start, value))
+                points.append((end, float(event["amount"])))
+
+        curves = {}
+        for name, lanes in keyframes.items():
+            curves[name] = [(lane, np.array([t for t, _ in points]), np.array([v for _, v in points]))
+                            for lane, points in lanes.items()]
+        return curves
+
+    @property
+    def active(self) -> bool:
+        return bool(self._curves)
+
+    def update(self, song_ms: float):
+        if not self._curves:
+            return
+        self._time = song_ms / 1000
+        for name, lanes in self._curves.items():
+            amounts = self.amounts[name]
+            for lane, times, values in lanes:
+                amounts[lane] = np.interp(song_ms, times, values)
+
+        drunk, tipsy, rotate, reverse = (self.amounts[name] for name in MODIFIER_TYPES)
+        height = arcade.get_window().height
+        x = self._spawn_x + self._drunk(self._column, drunk, self._lane_size, 0.0)
+        y = self._spawn_y + (height - 2 * self._spawn_y) * reverse \
+            + tipsy * np.cos(self._time * 1.2 + self._column * 1.8) * self._lane_size * 0.4
+        angle = self._spawn_angle + rotate
+        self.scroll_factor = 1 - 2 * reverse
+
+        for receptor, rx, ry, ra in zip(self._session.receptor_mgr.receptors, x.tolist(), y.tolist(), angle.tolist()):
+            receptor.position = (rx, ry)
+            receptor.angle = ra
+
+    def _drunk(self, column, amount, size, distance):
+        height = arcade.get_window().height
+        return amount * np.cos(self._time + column * 0.2 + distance / height * DRUNK_PHASE_PER_SCREEN) * size / 2
+
+    def note_sway(self, lanes: np.ndarray, distances: np.ndarray) -> np.ndarray:
+        """Sideways offset of notes at *distances* up their lanes, relative to the receptor's own sway."""
+        drunk = self.amounts["drunk"][lanes]
+        if not drunk.any():
+            return np.zeros(len(lanes))
+        column, size = self._column[lanes], self._lane_size[lanes]
+        return self._drunk(column, drunk, size, distances) - self._drunk(column, drunk, size, 0.0)
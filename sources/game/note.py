@@ -3,11 +3,26 @@ import math
 import pathlib
 from typing import Dict, List, Tuple, Any, Optional
 import arcade
-from sources.utils.event_bus import *
+import numpy as np
+from sources.utils import load_animation, load_texture
+from .modchart import MIN_SCROLL_FACTOR
+from .scroll import ScrollVelocityMap
 
 REMOVE_DELAY_MS = 200
 MISS_ALPHA = 50
 
+# per-note flag bits in a NoteManager snapshot
+FLAG_HIT = 1
+FLAG_MISS = 2
+FLAG_RELEASED_EARLY = 4
+FLAG_PRESSED = 8
+FLAG_RELEASED = 16
+# a note spawns this long before it would scroll into view, so it never pops in between two fixed ticks
+SPAWN_MARGIN_MS = 50
+DIRECTION_NAMES = ("left", "down", "up", "right")
+# the window a session without a camera spawns notes for, as if it were drawn at the default 720p
+HEADLESS_VIEW_SIZE = (1280, 720)
+
 def calculate_line_bounds(
     point_a: Tuple[float, float], 
     point_b: Tuple[float, float], 
@@ -30,6 +45,29 @@ def calculate_line_bounds(
 
     return left, bottom, final_width, final_height
 
+def lane_visible_range(
+    receptor: arcade.Sprite,
+    left: float,
+    bottom: float,
+    right: float,
+    top: float
+) -> Tuple[float, float]:
+    """Scroll distances, measured from the receptor the way notes approach it, that lie inside the rectangle.
+
+    Returns an empty range (low > high) when the lane never crosses the rectangle.
+    """
+    rad = math.radians(-receptor.angle + 90)
+    low, high = -math.inf, math.inf
+    for origin, direction, lower, upper in ((receptor.center_x, -math.cos(rad), left, right),
+                                            (receptor.center_y, -math.sin(rad), bottom, top)):
+        if abs(direction) < 1e-9:
+            if not lower <= origin <= upper:
+                return 0.0, -1.0
+            continue
+        t1, t2 = (lower - origin) / direction, (upper - origin) / direction
+        low, high = max(low, min(t1, t2)), min(high, max(t1, t2))
+    return low, high
+
 class HoldSegment(arcade.Sprite):
     def __init__(
         self, 
@@ -38,147 +76,269 @@ class HoldSegment(arcade.Sprite):
         texture_source: Any, 
         base_height: float, 
         scale: float,
+        scroll_step: float,
     ):
         texture = texture_source.keyframes[0].texture if hasattr(texture_source, "keyframes") else texture_source
         super().__init__(texture, scale, 0, 0)
         self.parent_note = note
         self.segment_index = index
+        self.direction_index = note.direction_index
         self._base_height = base_height
-        self._sync_position()
+        # segments trail the head at fixed steps further up the lane
+        self.scroll_position = note.scroll_position + (index + 1) * scroll_step
+
+class NoteChart:
+    """Every note of a chart as parallel arrays sorted by strum time, with each note's gameplay state.
+
+    A note costs a few bytes here instead of a dict. Its flags and judgement
+    are kept here while it has no sprite; a live Note works on plain
+    attributes and syncs them back at despawn and snapshot time.
+    """
+    __slots__ = ("direction_index", "strum_time", "sustain_length", "scroll_position", "type_index",
+                 "note_types", "type_must_hit", "type_penalty", "flags", "judgement_index", "judgements")
+
+    def __init__(self, notes: list, note_types: list, type_must_hit: list, type_penalty: list, scroll: ScrollVelocityMap):
+        # notes are (strum_time, direction_index, sustain_length, type_index) tuples
+        columns = np.array(notes, dtype=float).reshape(-1, 4)
+        # stable, so notes sharing a time keep chart order
+        columns = columns[np.argsort(columns[:, 0], kind="stable")]
+        self.strum_time = np.ascontiguousarray(columns[:, 0])
+        self.direction_index = columns[:, 1].astype(np.int8)
+        self.sustain_length = np.ascontiguousarray(columns[:, 2])
+        self.type_index = columns[:, 3].astype(np.uint8)
+        self.scroll_position = np.array([scroll.position(t) for t in self.strum_time.tolist()])
+        self.note_types = note_types
+        self.type_must_hit = type_must_hit
+        self.type_penalty = type_penalty
+
+        self.flags = bytearray(len(self.strum_time))
+        self.judgement_index = bytearray(len(self.strum_time))
+        # index 0 is "not judged"; names are appended as they are first given out
+        self.judgements = [""]
+
+    def __len__(self):
+        return len(self.flags)
+
+    def reset_state(self):
+        self.flags[:] = bytes(len(self.flags))
+        self.judgement_index[:] = bytes(len(self.flags))
+
+    def judgement(self, index: int) -> str:
+        return self.judgements[self.judgement_index[index]]
+
+    def set_judgement(self, index: int, name: str):
+        if name not in self.judgements:
+            self.judgements.append(name)
+        self.judgement_index[index] = self.judgements.index(name)
 
-    def update(self, delta_time: float):
-        self._sync_position()
-        return super().update(delta_time)
-
-    def _sync_position(self):
-        self.angle = self.parent_note.angle
-        direction_radian = math.radians(-self.angle - 90)
-        step = self._base_height * self.scale_y
-        offset = (self.segment_index + 1) * step
-        
-        self.center_x = self.parent_note.center_x + math.cos(direction_radian) * offset
-        self.center_y = self.parent_note.center_y + math.sin(direction_radian) * offset
 
 class Note(arcade.TextureAnimationSprite):
+    """The sprite of a live note; its gameplay state is loaded from the NoteChart at spawn and stored back with store_state."""
     def __init__(
         self, 
-        direction_index: int,
-        strum_time: float, 
-        sustain_length: float,
-        note_type: str, 
+        session,
+        chart_index: int,
         settings: dict, 
         assets: dict,
-        must_hit_note: bool = True,
-        penalty_note: bool = False
     ):
-        self.direction_index = direction_index
-        self.strum_time = strum_time
-        self.sustain_length = sustain_length
-        self.note_type = note_type
-        self._settings = settings
-        self._assets = assets
-        self.must_hit_note = must_hit_note
-        self.penalty_note = penalty_note
-        
-        # flags used by the AI/opponent logic
-        self._pressed = False
-        self._released = False
+        self._note_mgr = session.note_mgr
+        self._song_mgr = session.song_mgr
+        self.chart = chart = self._note_mgr.chart
+        self.chart_index = chart_index
+        # copied out as plain values for the per-tick loops
+        self.direction_index = int(chart.direction_index[chart_index])
+        self.strum_time = float(chart.strum_time[chart_index])
+        self.sustain_length = float(chart.sustain_length[chart_index])
+        self.scroll_position = float(chart.scroll_position[chart_index])
+        type_index = chart.type_index[chart_index]
+        self.must_hit_note = chart.type_must_hit[type_index]
+        self.penalty_note = chart.type_penalty[type_index]
 
         head_asset = assets["head"]
         if isinstance(head_asset, arcade.Texture):
             head_asset = arcade.TextureAnimation([arcade.TextureKeyframe(head_asset, 100)])
         super().__init__(0, 0, settings["scale"], head_asset)
 
-        from sources.views import MainGameView
-        receptor_mgr = MainGameView.current.receptor_mgr
-        self.target_receptor = receptor_mgr.receptors[direction_index]
-        self.is_hit = False
-        self.is_miss = False
-        self.is_released_early = False
-        self.judgement = ""
+        # plain attributes, read every tick by judgement and the bot
+        self.load_state()
+
         self._segments: List[HoldSegment] = []
-        
         if self.sustain_length > 0:
-            self._create_sustain_tail()
+            self._create_sustain_tail(assets)
+
+    def load_state(self):
+        flags = self.chart.flags[self.chart_index]
+        self.is_hit = bool(flags & FLAG_HIT)
+        self.is_miss = bool(flags & FLAG_MISS)
+        self.is_released_early = bool(flags & FLAG_RELEASED_EARLY)
+        # flags used by the AI/opponent logic
+        self._pressed = bool(flags & FLAG_PRESSED)
+        self._released = bool(flags & FLAG_RELEASED)
+        self.judgement = self.chart.judgement(self.chart_index)
+
+    def store_state(self):
+        self.chart.flags[self.chart_index] = (self.is_hit * FLAG_HIT | self.is_miss * FLAG_MISS
+                                              | self.is_released_early * FLAG_RELEASED_EARLY
+                                              | self._pressed * FLAG_PRESSED | self._released * FLAG_RELEASED)
+        self.chart.set_judgement(self.chart_index, self.judgement)
+
+    @property
+    def note_type(self) -> str:
+        return self.chart.note_types[self.chart.type_index[self.chart_index]]
 
     @property
     def should_despawn(self) -> bool:
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
-        return song_mgr.song_ms >= self.strum_time + self.sustain_length + REMOVE_DELAY_MS
+        return self._song_mgr.song_ms >= self.strum_time + self.sustain_length + REMOVE_DELAY_MS
 
     @property
     def is_opponent(self) -> bool:
         return self.direction_index >= 4
 
-    def update(self, delta_time: float):
-        self._update_position()
-        if self.should_despawn:
-            self.despawn()
-        self.visible = not self.is_hit
-        return super().update(delta_time)
-
     def set_visual_miss(self):
         self.alpha = MISS_ALPHA
         for segment in self._segments:
             segment.alpha = MISS_ALPHA
 
-    def _update_position(self):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
-        note_mgr = MainGameView.current.note_mgr
-
-        time_gap = self.strum_time - song_mgr.song_ms
-        distance = time_gap * note_mgr.pixels_per_ms
-        self.angle = self.target_receptor.angle
-        rad = math.radians(-self.angle + 90)
-        self.center_x = self.target_receptor.center_x - math.cos(rad) * distance
-        self.center_y = self.target_receptor.center_y - math.sin(rad) * distance
-
-    def _create_sustain_tail(self):
-        from sources.views import MainGameView
-        note_mgr = MainGameView.current.note_mgr
-    
-        hold_tex = self._assets["hold"]
+    @property
+    def scroll_distance(self) -> float:
+        """How far the note still is from its receptor along the lane."""
+        return self.scroll_position - self._note_mgr.song_position
+
+    @property
+    def segments(self) -> List[HoldSegment]:
+        return self._segments
+
+    def _create_sustain_tail(self, assets: dict):
+        note_mgr = self._note_mgr
+
+        hold_tex = assets["hold"]
         base_h = hold_tex.height if isinstance(hold_tex, arcade.Texture) else hold_tex.keyframes[0].texture.height
-        px_length = self.sustain_length * note_mgr.pixels_per_ms
-        count = math.ceil(px_length / (base_h * self.scale_y))
+        px_length = note_mgr.scroll.position(self.strum_time + self.sustain_length) - self.scroll_position
+        # one segment's height on screen, in scroll pixels at the current playback rate
+        scroll_step = base_h * self.scale_y * note_mgr.playback_rate
+        count = math.ceil(px_length / scroll_step)
         
         for i in range(count):
-            seg = HoldSegment(self, i, hold_tex, base_h, self.scale_y)
+            seg = HoldSegment(self, i, hold_tex, base_h, self.scale_y, scroll_step)
             note_mgr.sustains[self.direction_index].append(seg)
             self._segments.append(seg)
         
         if self._segments:
-            self._segments[-1].texture = self._assets["end"]
+            self._segments[-1].texture = assets["end"]
 
     def despawn(self):
+        self.store_state()
         self.remove_from_sprite_lists()
         for seg in self._segments:
             seg.remove_from_sprite_lists()
 
 class NoteManager:
-    def __init__(self, song_data: dict, is_bot_play : bool):
+    def __init__(self, session, song_data: dict, is_bot_play : bool, judgement_windows: dict = None,
+                 headless_spawn_distance: float = None):
+        self._session = session
+        self._bus = session.bus
         self._song_data = song_data
-        self.pixels_per_ms = 0.45 * song_data["speed"]
+        self.scroll = ScrollVelocityMap(song_data["speed"], song_data.get("scrollVelocities", []))
+        self.pixels_per_ms = self.scroll.pixels_per_ms
+        self._position_ms = None
+        self._song_position = 0.0
         self._note_assets = {}
         self._note_settings = {}
         self._load_resources()
 
-        self.notes = arcade.SpriteList()
-        self.sustains = {i: arcade.SpriteList() for i in range(8)}
-        self._chart = []
-        self._parse_chart()
+        # lazy sprite lists defer GL setup to the first draw so charts can be simulated without a window
+        self.notes = arcade.SpriteList(lazy=True)
+        self.sustains = {i: arcade.SpriteList(lazy=True) for i in range(8)}
+        self.chart = self._parse_chart()
         
-        self.spawn_lead_ms = 2000
         self._next_spawn_idx = 0
+        self.playback_rate = 1.0
+        # song time of the latest gameplay tick; a replay stops playing back there
+        self.last_tick_ms = 0.0
         
-        with open("assets/config/judgements.json", 'r') as file:
-            self._judgement_windows = json.load(file)
-        self.hit_window_ms = max(self._judgement_windows.values())
+        if judgement_windows is None:
+            with open("assets/config/judgements.json", 'r') as file:
+                judgement_windows = json.load(file)
+        self.set_judgement_windows(judgement_windows)
+        # used without a camera; None derives it from HEADLESS_VIEW_SIZE on first use
+        self._headless_spawn_distance = headless_spawn_distance
+        self.spawn_distance = self._compute_spawn_distance()
         
         self.is_bot_play = is_bot_play
 
+    def set_judgement_windows(self, judgement_windows: dict):
+        self._judgement_windows = dict(judgement_windows)
+        self.hit_window_ms = max(self._judgement_windows.values()) * self.playback_rate
+
+    def set_playback_rate(self, rate: float):
+        """Match a song playing *rate* times as fast.
+
+        Judgement windows stretch by *rate* in song time and scroll distances
+        shrink by it on screen, so both stay as wide and as fast in real time
+        as at normal speed. Live notes are rebuilt with their state kept.
+        """
+        state = self.snapshot()
+        self.playback_rate = rate
+        self.set_judgement_windows(self._judgement_windows)
+        self.restore(state)
+
+    def reset(self):
+        """Drop every live note and start spawning from the top of the chart again."""
+        for note in list(self.notes):
+            note.despawn()
+        self.notes.clear()
+        for sustain_list in self.sustains.values():
+            sustain_list.clear()
+        self.chart.reset_state()
+        self._next_spawn_idx = 0
+        self.last_tick_ms = 0.0
+
+    def seek(self, song_ms: float):
+        """Rebuild the live notes for a jump to *song_ms*; call after the song clock has moved.
+
+        Notes that can no longer be judged there are skipped without counting
+        as misses, and the spawn cursor is found by binary search. A hold
+        whose head is gone but whose tail is still playing is rebuilt: the
+        opponent's is left to its AI, the player's is marked missed without
+        scoring it, as if restored from a snapshot where it was.
+        """
+        self.reset()
+        chart = self.chart
+        judge_from = song_ms - self.hit_window_ms
+        first = int(np.searchsorted(chart.strum_time, judge_from, side="left"))
+        ongoing = np.flatnonzero((chart.sustain_length[:first] > 0)
+                                 & (chart.strum_time[:first] + chart.sustain_length[:first] >= judge_from))
+        for chart_index in ongoing.tolist():
+            if chart.direction_index[chart_index] < 4:
+                # pressed as well, so bot play doesn't take it up again
+                chart.flags[chart_index] = FLAG_MISS | FLAG_PRESSED
+            note = self._create_note(chart_index)
+            if note.is_miss:
+                note.set_visual_miss()
+        self._next_spawn_idx = first
+        self._spawn_notes()
+
+    def snapshot(self) -> tuple:
+        """Spawn cursor plus chart index, flag bits and judgement of every live note; no sprites."""
+        for note in self.notes:
+            note.store_state()
+        indices = np.fromiter((note.chart_index for note in self.notes), dtype=np.int32, count=len(self.notes))
+        flags = np.frombuffer(self.chart.flags, dtype=np.uint8)[indices]
+        judgements = np.frombuffer(self.chart.judgement_index, dtype=np.uint8)[indices]
+        return self._next_spawn_idx, indices, flags, judgements
+
+    def restore(self, state: tuple):
+        """Rebuild the live notes from a snapshot."""
+        next_spawn_idx, indices, flags, judgements = state
+        self.reset()
+        np.frombuffer(self.chart.flags, dtype=np.uint8)[indices] = flags
+        np.frombuffer(self.chart.judgement_index, dtype=np.uint8)[indices] = judgements
+        for chart_index, flag in zip(indices.tolist(), flags.tolist()):
+            note = self._create_note(chart_index)
+            if flag & (FLAG_MISS | FLAG_RELEASED_EARLY):
+                note.set_visual_miss()
+        self._next_spawn_idx = next_spawn_idx
+
     def _load_resources(self):
         types = {"default", "alt_animation"}
         for section in self._song_data.get("notes", []):
@@ -194,29 +354,38 @@ class NoteManager:
                 for part in ["head", "hold", "end"]:
                     path = pathlib.Path(self._note_settings[type_name]["paths"][direction][part])
                     self._note_assets[type_name][direction][part] = (
-                        arcade.load_animated_gif(str(path)).animation if path.suffix == ".gif" 
-                        else arcade.load_texture(str(path))
+                        load_animation(path) if path.suffix == ".gif" 
+                        else load_texture(path)
                     )
 
-    def _parse_chart(self):
+        # half the diagonal of the biggest sprite: anything whose center is further out than that can't be on screen
+        extent = 0.0
+        for type_name, directions in self._note_assets.items():
+            scale = self._note_settings[type_name]["scale"]
+            for parts in directions.values():
+                for asset in parts.values():
+                    texture = asset.keyframes[0].texture if hasattr(asset, "keyframes") else asset
+                    extent = max(extent, math.hypot(texture.width, texture.height) * scale / 2)
+        self._cull_margin = extent
+
+    def _parse_chart(self) -> NoteChart:
+        notes = []
+        note_types, type_must_hit, type_penalty = [], [], []
+        type_indices = {}
         for section in self._song_data["notes"]:
             for raw_note in section["sectionNotes"]:
                 lane = raw_note[1] % 4
                 side = (0 if raw_note[1] < 4 else 4) if section["mustHitSection"] else (4 if raw_note[1] < 4 else 0)
                 note_type = raw_note[3] if len(raw_note) > 3 else "default"
-                # load must_hit_note and penalty_note from note_type settings
-                note_settings = self._note_settings.get(note_type, self._note_settings.get("default", {}))
-                must_hit = note_settings.get("must_hit_note", True)
-                is_penalty = note_settings.get("penaly_note", False)  # note: typo in original data
-                self._chart.append({
-                    "direction_index": lane + side,
-                    "strum_time": raw_note[0],
-                    "sustain_length": raw_note[2],
-                    "note_type": note_type,
-                    "must_hit_note": must_hit,
-                    "penalty_note": is_penalty
-                })
-        self._chart.sort(key=lambda x: x["strum_time"])
+                if note_type not in type_indices:
+                    type_indices[note_type] = len(note_types)
+                    # load must_hit_note and penalty_note from note_type settings
+                    note_settings = self._note_settings.get(note_type, self._note_settings.get("default", {}))
+                    note_types.append(note_type)
+                    type_must_hit.append(note_settings.get("must_hit_note", True))
+                    type_penalty.append(note_settings.get("penaly_note", False))  # note: typo in original data
+                notes.append((raw_note[0], lane + side, raw_note[2], type_indices[note_type]))
+        return NoteChart(notes, note_types, type_must_hit, type_penalty, self.scroll)
 
     def _process_hit(self, direction_index : int, ms : int):
         candidates = [note for note in self.notes if not note.is_hit and not note.is_miss 
@@ -231,32 +400,96 @@ class NoteManager:
         diff = abs(hit_note.strum_time - ms)
         
         for name, window in self._judgement_windows.items():
-            if diff <= window:
+            if diff <= window * self.playback_rate:
                 hit_note.judgement = name
                 break
         
         return hit_note
 
+    def _view_rect(self, zoom: float) -> Optional[Tuple[float, float, float, float]]:
+        """World rectangle the note camera shows at the given zoom, None without a camera."""
+        camera_mgr = self._session.camera_mgr
+        if camera_mgr is None:
+            return None
+        win = arcade.get_window()
+        cx, cy = camera_mgr.camera_note.position
+        half_w, half_h = win.width / 2 / zoom, win.height / 2 / zoom
+        margin = self._cull_margin
+        return cx - half_w - margin, cy - half_h - margin, cx + half_w + margin, cy + half_h + margin
+
+    def _visible_ranges(self, zoom: float) -> Optional[List[Tuple[float, float]]]:
+        rect = self._view_rect(zoom)
+        if rect is None:
+            return None
+        return self._lane_ranges(rect)
+
+    def _lane_ranges(self, rect: Tuple[float, float, float, float]) -> List[Tuple[float, float]]:
+        return [lane_visible_range(receptor, *rect) for receptor in self._session.receptor_mgr.receptors]
+
+    def _compute_spawn_distance(self) -> float:
+        """How far up the lane, in screen pixels, notes have to exist.
+
+        Enough for the farthest lane to scroll its note in from the edge of the
+        widest view the note camera gets (beat bumps only zoom in). Without a
+        camera nothing is drawn, but the session keeps as many notes live as
+        a HEADLESS_VIEW_SIZE window would, so simulations carry the same load
+        as the game.
+        """
+        camera_mgr = self._session.camera_mgr
+        if camera_mgr is None:
+            if self._headless_spawn_distance is None:
+                width, height = HEADLESS_VIEW_SIZE
+                margin = self._cull_margin
+                self._headless_spawn_distance = self._spawn_reach(self._lane_ranges((-margin, -margin, width + margin, height + margin)))
+            return self._headless_spawn_distance
+        return self._spawn_reach(self._visible_ranges(min(camera_mgr.camera_note.zoom, 1.0)))
+
+    def _spawn_reach(self, lane_ranges: List[Tuple[float, float]]) -> float:
+        distance = 0.0
+        modchart_mgr = self._session.modchart_mgr
+        for lane, (low, high) in enumerate(lane_ranges):
+            if high < low:
+                continue
+            factor = modchart_mgr.scroll_factor[lane] if modchart_mgr is not None else 1.0
+            # a flipped lane brings its notes in from the other end
+            reach = high if factor >= 0 else -low
+            distance = max(distance, reach / max(abs(factor), MIN_SCROLL_FACTOR))
+        return distance
+
+    @property
+    def song_position(self) -> float:
+        """Scroll position of the drawn song time, looked up once per song time and shared by every note."""
+        song_ms = self._session.song_mgr.visual_ms
+        if song_ms != self._position_ms:
+            self._position_ms = song_ms
+            self._song_position = self.scroll.position(song_ms)
+        return self._song_position
+
     def _spawn_notes(self):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
-        while self._next_spawn_idx < len(self._chart):
-            info = self._chart[self._next_spawn_idx]
-            if info["strum_time"] > song_mgr.song_ms + self.spawn_lead_ms:
+        song_mgr = self._session.song_mgr
+        # notes must exist for the whole hit window so judging doesn't depend on what is drawn
+        judge_until = song_mgr.song_ms + self.hit_window_ms + SPAWN_MARGIN_MS
+        spawn_position = self.scroll.position(song_mgr.visual_ms + SPAWN_MARGIN_MS) + self.spawn_distance * self.playback_rate
+        chart = self.chart
+        while self._next_spawn_idx < len(chart):
+            index = self._next_spawn_idx
+            if chart.strum_time[index] > judge_until and chart.scroll_position[index] > spawn_position:
                 break
 
-            direction_name = ["left", "down", "up", "right"][info["direction_index"] % 4]
-            new_note = Note(
-                info["direction_index"], info["strum_time"], info["sustain_length"], info["note_type"],
-                self._note_settings[info["note_type"]], self._note_assets[info["note_type"]][direction_name],
-                info["must_hit_note"], info["penalty_note"]
-            )
-            self.notes.append(new_note)
+            self._create_note(self._next_spawn_idx)
             self._next_spawn_idx += 1
 
+    def _create_note(self, chart_index: int) -> Note:
+        chart = self.chart
+        note_type = chart.note_types[chart.type_index[chart_index]]
+        direction_name = DIRECTION_NAMES[chart.direction_index[chart_index] % 4]
+        new_note = Note(self._session, chart_index, self._note_settings[note_type],
+                        self._note_assets[note_type][direction_name])
+        self.notes.append(new_note)
+        return new_note
+
     def _opponent_input(self):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+        song_mgr = self._session.song_mgr
     
         song_ms = song_mgr.song_ms
         for note in self.notes:
@@ -265,15 +498,14 @@ class NoteManager:
                     note._pressed = True
                     note.is_hit = True
                     note.judgement = "auto"
-                    bus.publish("opponent_pressed", direction_index=note.direction_index, note=note)
+                    self._bus.publish("opponent_pressed", direction_index=note.direction_index, note=note)
                 if not note._released and song_ms > note.strum_time + note.sustain_length:
                     note._released = True
-                    bus.publish("opponent_released", direction_index=note.direction_index)
+                    self._bus.publish("opponent_released", direction_index=note.direction_index)
                 continue
 
     def _bot_play(self):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+        song_mgr = self._session.song_mgr
 
         song_ms = song_mgr.song_ms
         for note in self.notes:
@@ -285,24 +517,27 @@ class NoteManager:
                     note._pressed = True
                     note.is_hit = True
                     note.judgement = "auto"
-                    bus.publish("player_pressed", direction_index=note.direction_index, note=note)
+                    self._bus.publish("player_pressed", direction_index=note.direction_index, note=note)
                 if not note._released and song_ms > note.strum_time + note.sustain_length:
                     note._released = True
-                    bus.publish("player_released", direction_index=note.direction_index)
+                    self._bus.publish("player_released", direction_index=note.direction_index)
                 continue
     
     def _draw_sustains(self):
-        from sources.views import MainGameView
-        camera_mgr = MainGameView.current.camera_mgr
-        receptor_mgr = MainGameView.current.receptor_mgr
+        camera_mgr = self._session.camera_mgr
+        receptor_mgr = self._session.receptor_mgr
     
         win = arcade.get_window()
         zoom = camera_mgr.camera_note.zoom
         offset_x, offset_y = (win.width / 2) * (1 - zoom), (win.height / 2) * (1 - zoom)
+        modchart_mgr = self._session.modchart_mgr
 
         for i, sustain_list in self.sustains.items():
             receptor = receptor_mgr.receptors[i]
             rad = math.radians(-receptor.angle + 90)
+            # reverse flips the side of the receptor the holds come from
+            if modchart_mgr is not None and modchart_mgr.scroll_factor[i] < 0:
+                rad += math.pi
             
             cx = (receptor.center_x * zoom) + offset_x
             cy = (receptor.center_y * zoom - math.sin(rad) * receptor.texture.height * zoom * 0.3) + offset_y
@@ -320,18 +555,23 @@ class NoteManager:
                     sustain_list.draw()
 
     def on_key_press(self, direction_index: int):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
-        
-        note = self._process_hit(direction_index, song_mgr.song_ms)
-        bus.publish("player_pressed", direction_index=direction_index, note=note)
+        song_mgr = self._session.song_mgr
+
+        # inputs are judged at whole microseconds so a recorded replay judges identically
+        time_us = round(song_mgr.song_ms * 1000)
+        self._bus.publish("player_input", direction_index=direction_index, time_us=time_us, pressed=True)
+
+        note = self._process_hit(direction_index, time_us / 1000)
+        self._bus.publish("player_pressed", direction_index=direction_index, note=note)
 
     def on_key_release(self, direction_index: int):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+        song_mgr = self._session.song_mgr
 
-        song_ms = song_mgr.song_ms
-        bus.publish("player_released", direction_index=direction_index)
+        time_us = round(song_mgr.song_ms * 1000)
+        self._bus.publish("player_input", direction_index=direction_index, time_us=time_us, pressed=False)
+
+        song_ms = time_us / 1000
+        self._bus.publish("player_released", direction_index=direction_index)
 
         for note in self.notes:
             if (not note.is_opponent and note.direction_index == direction_index and 
@@ -340,32 +580,111 @@ class NoteManager:
                 
                 note.is_released_early = True
                 note.set_visual_miss()
-                bus.publish("player_note_miss", note=note)
+                self._bus.publish("player_note_miss", note=note)
                 break
 
-    def update(self, delta_time: float):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+    def fixed_update(self, delta_time: float):
+        """Gameplay tick: spawning, opponent/bot input, misses and despawning.
+
+        Runs at the fixed logic rate; none of it depends on where the notes are drawn.
+        """
+        song_mgr = self._session.song_mgr
 
+        self.spawn_distance = self._compute_spawn_distance()
         self._spawn_notes()
         self._opponent_input()
         if self.is_bot_play:
             self._bot_play()
 
-        self.notes.update(delta_time)
-        self.notes.update_animation(delta_time)
-        for sustain_list in self.sustains.values():
-            sustain_list.update(delta_time)
-
         song_ms = song_mgr.song_ms
+        self.last_tick_ms = song_ms
         for note in list(self.notes):
             if not note.is_opponent and not note.is_hit and not note.is_miss:
                 if song_ms > note.strum_time + self.hit_window_ms:
                     note.is_miss = True
                     note.set_visual_miss()
                     if note.must_hit_note:
-                        bus.publish("player_note_miss", note=note)
+                        self._bus.publish("player_note_miss", note=note)
+            if note.should_despawn:
+                note.despawn()
+
+    def update(self, delta_time: float):
+        # culled notes keep their frame until they scroll back into view
+        for note in self.notes:
+            if note.visible:
+                note.update_animation(delta_time)
+
+    def sync_positions(self):
+        """Move notes and sustain segments to where the song time puts them at this frame.
+
+        Every live sprite is placed in one pass of array math over its lane and
+        scroll distance; sprites outside the note camera's view are hidden and
+        not moved.
+        """
+        sprites = list(self.notes)
+        head_count = len(sprites)
+        for sustain_list in self.sustains.values():
+            sprites.extend(sustain_list)
+        if not sprites:
+            return
+
+        count = len(sprites)
+        lanes = np.fromiter((sprite.direction_index for sprite in sprites), dtype=np.intp, count=count)
+        distances = np.fromiter((sprite.scroll_position for sprite in sprites), dtype=float, count=count) - self.song_position
+        if self.playback_rate != 1.0:
+            # scroll pixels pass by rate times as fast, so they are drawn that much closer together
+            distances /= self.playback_rate
+
+        receptors = self._session.receptor_mgr.receptors
+        receptor_x = np.array([r.center_x for r in receptors])
+        receptor_y = np.array([r.center_y for r in receptors])
+        angles = np.array([r.angle for r in receptors])
+        rad = np.radians(90 - angles)
+        along_x, along_y = np.cos(rad)[lanes], np.sin(rad)[lanes]
+
+        modchart_mgr = self._session.modchart_mgr
+        scroll = distances
+        sway = None
+        if modchart_mgr is not None and modchart_mgr.active:
+            scroll = distances * modchart_mgr.scroll_factor[lanes]
+            sway = modchart_mgr.note_sway(lanes, distances)
+
+        x = receptor_x[lanes] - along_x * scroll
+        y = receptor_y[lanes] - along_y * scroll
+        if sway is not None:
+            # sideways is the lane direction turned a quarter clockwise
+            x += along_y * sway
+            y -= along_x * sway
+
+        visible = np.ones(count, dtype=bool)
+        camera_mgr = self._session.camera_mgr
+        if camera_mgr is not None:
+            left, bottom, right, top = self._view_rect(camera_mgr.camera_note.zoom)
+            visible = (x >= left) & (x <= right) & (y >= bottom) & (y <= top)
+        in_view = visible.tolist()
+        # hit heads stay hidden, their segments keep being drawn under the scissor
+        visible[:head_count] &= ~np.fromiter((note.is_hit for note in sprites[:head_count]), dtype=bool, count=head_count)
+
+        for sprite, sprite_x, sprite_y, angle, placed, shown in zip(sprites, x.tolist(), y.tolist(), angles[lanes].tolist(),
+                                                                   in_view, visible.tolist()):
+            if placed:
+                sprite.position = (sprite_x, sprite_y)
+                sprite.angle = angle
+            if sprite.visible != shown:
+                sprite.visible = shown
+
+    @property
+    def judgement_windows(self) -> dict:
+        return dict(self._judgement_windows)
+
+    @property
+    def chart_end_ms(self) -> float:
+        """Time after which no note can be judged or despawned anymore."""
+        if not len(self.chart):
+            return 0
+        return float((self.chart.strum_time + self.chart.sustain_length).max()) + max(self.hit_window_ms, REMOVE_DELAY_MS)
 
     def draw(self):
+        self.sync_positions()
         self._draw_sustains()
         self.notes.draw()
\ No newline at end of file
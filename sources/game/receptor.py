@@ -1,41 +1,42 @@
-import copy
 import json
 import time
 import arcade
-from sources.utils import *
+from sources.utils import load_animation
 
 PRESS_MIN_DISPLAY_MS = 80
 
 class ReceptorManager:
-    def __init__(self, receptor_name : str):
+    def __init__(self, session, receptor_name : str):
+        self._session = session
+        self._bus = session.bus
         with open(f"assets/ui/receptors/{receptor_name}/data.json", 'r') as f:
             data = json.load(f)
 
         loaded_animation = {"left" : {}, "down" : {}, "up" : {}, "right" : {}}
         for direction_name in ["left", "down", "up", "right"]:
             for animation_name in ["idle", "press", "confirm"]:
-                loaded_animation[direction_name][animation_name] = arcade.load_animated_gif(data["animations"][direction_name][animation_name]).animation
+                loaded_animation[direction_name][animation_name] = load_animation(data["animations"][direction_name][animation_name])
 
-        self.receptors = arcade.SpriteList()
+        self.receptors = arcade.SpriteList(lazy=True)
         for actor_role in ["player", "opponent"]:
             for direction_name in ["left", "down", "up", "right"]:
                 receptor = Receptor(
                     direction_index     =ReceptorManager.name_to_index(f"{actor_role}_{direction_name}"),
                     loaded_settings     =data["settings"][actor_role][direction_name],
-                    loaded_animation    =copy.deepcopy(loaded_animation[direction_name])
+                    loaded_animation    =loaded_animation[direction_name]
                     )
                 self.receptors.append(receptor)
 
-        bus.subscribe("player_pressed", self._note_pressed)
-        bus.subscribe("opponent_pressed", self._note_pressed)
-        bus.subscribe("player_released", self._note_released)
-        bus.subscribe("opponent_released", self._note_released)
+        self._bus.subscribe("player_pressed", self._note_pressed)
+        self._bus.subscribe("opponent_pressed", self._note_pressed)
+        self._bus.subscribe("player_released", self._note_released)
+        self._bus.subscribe("opponent_released", self._note_released)
 
     def on_hide_view(self):
-        bus.unsubscribe("player_pressed", self._note_pressed)
-        bus.unsubscribe("opponent_pressed", self._note_pressed)
-        bus.unsubscribe("player_released", self._note_released)
-        bus.unsubscribe("opponent_released", self._note_released)
+        self._bus.unsubscribe("player_pressed", self._note_pressed)
+        self._bus.unsubscribe("opponent_pressed", self._note_pressed)
+        self._bus.unsubscribe("player_released", self._note_released)
+        self._bus.unsubscribe("opponent_released", self._note_released)
 
     @staticmethod
     def index_to_name(index : int):
@@ -72,12 +73,11 @@ class ReceptorManager:
         self.receptors[direction_index].request_idle()
 
     def update(self, delta_time : float):
-        from sources.views import MainGameView
-        song_mgr = MainGameView.current.song_mgr
+        song_ms = self._session.song_mgr.song_ms
 
         for r in self.receptors:
             r.update(delta_time)
-            r.update_from_song_time(song_mgr.song_ms)
+            r.update_from_song_time(song_ms)
             r.update_idle_transition()
     
     def draw(self):
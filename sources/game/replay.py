@@ -0,0 +1,261 @@
+"""Compact input replays: recording during play and deterministic headless playback.
+
+File layout (little endian):
+    magic "RFRP", u8 version, 32 byte chart hash, u16 + utf-8 song name,
+    u8 judgement count + (u8 + utf-8 name, f64 window ms) each,
+    i64 score, f64 accuracy, u8 hit count entries + (u8 + utf-8 name, u32 count) each,
+    f64 song ms of the run's last gameplay tick (NaN: played to the end, version 1 files lack it),
+    u32 event count, then a zlib stream of varints: (zigzag(delta_us) << 3) | (lane << 1) | pressed
+
+Deltas are signed from version 3 on: the song clock starts before 0 ms, and
+the first input can land there. Versions 1 and 2 stored them unsigned.
+"""
+import hashlib
+import json
+import math
+import pathlib
+import struct
+import zlib
+
+MAGIC = b"RFRP"
+VERSION = 3
+PLAYBACK_TICK_MS = 1000 / 60
+
+
+def chart_hash(song_data: dict) -> bytes:
+    """SHA-256 over the parts of the song data that affect judgement."""
+    payload = json.dumps(
+        {"bpm": song_data["bpm"], "speed": song_data["speed"], "notes": song_data["notes"]},
+        sort_keys=True, separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).digest()
+
+
+def _write_varint(out: bytearray, value: int):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data: bytes, pos: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value << 1 if value >= 0 else (-value << 1) - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value >> 1 if not value & 1 else -((value + 1) >> 1)
+
+
+def _write_str(out: bytearray, text: str, length_format: str = "<B"):
+    raw = text.encode("utf-8")
+    out += struct.pack(length_format, len(raw))
+    out += raw
+
+
+def _read_str(data: bytes, pos: int, length_format: str = "<B") -> tuple[str, int]:
+    (length,) = struct.unpack_from(length_format, data, pos)
+    pos += struct.calcsize(length_format)
+    return data[pos:pos + length].decode("utf-8"), pos + length
+
+
+class Replay:
+    """One recorded run: lane press/release events plus what the run claimed to score."""
+    def __init__(self, song_name: str, chart_hash: bytes, judgement_windows: dict,
+                 events: list[tuple[int, int, bool]], score: int = 0, accuracy: float = 0.0,
+                 hit_counts: dict = None, end_ms: float = None):
+        self.song_name = song_name
+        self.chart_hash = chart_hash
+        self.judgement_windows = judgement_windows
+        # (song time in microseconds, lane 0-3, pressed)
+        self.events = events
+        self.score = score
+        self.accuracy = accuracy
+        self.hit_counts = hit_counts or {}
+        # where the run stopped being judged, None for the whole chart
+        self.end_ms = end_ms
+
+    @property
+    def claimed_result(self) -> dict:
+        return {"score": self.score, "accuracy": self.accuracy, "hit_counts": dict(self.hit_counts)}
+
+    def to_bytes(self) -> bytes:
+        out = bytearray(MAGIC)
+        out += struct.pack("<B32s", VERSION, self.chart_hash)
+        _write_str(out, self.song_name, "<H")
+
+        out += struct.pack("<B", len(self.judgement_windows))
+        for name, window in self.judgement_windows.items():
+            _write_str(out, name)
+            out += struct.pack("<d", window)
+
+        out += struct.pack("<qdB", self.score, self.accuracy, len(self.hit_counts))
+        for name, count in self.hit_counts.items():
+            _write_str(out, name)
+            out += struct.pack("<I", count)
+        out += struct.pack("<d", math.nan if self.end_ms is None else self.end_ms)
+
+        stream = bytearray()
+        last_us = 0
+        for time_us, lane, pressed in self.events:
+            _write_varint(stream, (_zigzag(time_us - last_us) << 3) | (lane << 1) | int(pressed))
+            last_us = time_us
+        out += struct.pack("<I", len(self.events))
+        out += zlib.compress(bytes(stream), 9)
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Replay':
+        if data[:4] != MAGIC:
+            raise ValueError("not a replay file")
+        version, hash_bytes = struct.unpack_from("<B32s", data, 4)
+        if not 1 <= version <= VERSION:
+            raise ValueError(f"unsupported replay version {version}")
+        pos = 4 + struct.calcsize("<B32s")
+        song_name, pos = _read_str(data, pos, "<H")
+
+        (judgement_count,) = struct.unpack_from("<B", data, pos)
+        pos += 1
+        judgement_windows = {}
+        for _ in range(judgement_count):
+            name, pos = _read_str(data, pos)
+            (judgement_windows[name],) = struct.unpack_from("<d", data, pos)
+            pos += 8
+
+        score, accuracy, hit_count_entries = struct.unpack_from("<qdB", data, pos)
+        pos += struct.calcsize("<qdB")
+        hit_counts = {}
+        for _ in range(hit_count_entries):
+            name, pos = _read_str(data, pos)
+            (hit_counts[name],) = struct.unpack_from("<I", data, pos)
+            pos += 4
+        end_ms = None
+        if version >= 2:
+            (end_ms,) = struct.unpack_from("<d", data, pos)
+            pos += 8
+            if math.isnan(end_ms):
+                end_ms = None
+
+        (event_count,) = struct.unpack_from("<I", data, pos)
+        stream = zlib.decompress(data[pos + 4:])
+        events = []
+        time_us = stream_pos = 0
+        for _ in range(event_count):
+            value, stream_pos = _read_varint(stream, stream_pos)
+            time_us += _unzigzag(value >> 3) if version >= 3 else value >> 3
+            events.append((time_us, (value >> 1) & 0b11, bool(value & 1)))
+
+        return cls(song_name, hash_bytes, judgement_windows, events, score, accuracy, hit_counts, end_ms)
+
+    def save(self, path):
+        path = pathlib.Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(self.to_bytes())
+
+    @classmethod
+    def load(cls, path) -> 'Replay':
+        return cls.from_bytes(pathlib.Path(path).read_bytes())
+
+
+class ReplayRecorder:
+    """Collects the player's lane inputs from the session bus while a song is played."""
+    def __init__(self, session, song_data: dict, judgement_windows: dict):
+        self._session = session
+        self._bus = session.bus
+        self._song_name = song_data["name"]
+        self._chart_hash = chart_hash(song_data)
+        self._judgement_windows = dict(judgement_windows)
+        self.events: list[tuple[int, int, bool]] = []
+        # a seek or a playback rate change makes the inputs impossible to play back from the start
+        self.practice = False
+
+        self._bus.subscribe("player_input", self._player_input)
+        self._bus.subscribe("seeked", self._seeked)
+        self._bus.subscribe("playback_rate", self._playback_rate)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("player_input", self._player_input)
+        self._bus.unsubscribe("seeked", self._seeked)
+        self._bus.unsubscribe("playback_rate", self._playback_rate)
+
+    def _seeked(self, song_ms):
+        self.practice = True
+
+    def _playback_rate(self, rate):
+        self.practice = True
+
+    def _player_input(self, direction_index, time_us, pressed):
+        self.events.append((time_us, direction_index % 4, pressed))
+
+    def build(self, score_mgr) -> Replay:
+        """The replay of the run so far; it ends at the last gameplay tick, so a run quit mid-song plays back as far."""
+        return Replay(self._song_name, self._chart_hash, self._judgement_windows, list(self.events),
+                      score_mgr.score, score_mgr.accuracy, score_mgr.hit_counts,
+                      self._session.note_mgr.last_tick_ms)
+
+
+def play_replay(replay: Replay, song_data: dict, score_config: dict = None,
+                tick_ms: float = PLAYBACK_TICK_MS, simulation=None) -> dict:
+    """Feed *replay* through a headless simulation and return the recomputed result.
+
+    The result only depends on the input timestamps, not on the tick rate, so
+    playback runs with coarse ticks and jumps the clock exactly onto every input.
+    It stops at the replay's `end_ms`, where the recorded run last ticked;
+    inputs after it are judged without a tick, as they were live. Pass a *simulation* of the same chart to reuse its loaded assets.
+    """
+    from .simulation import HeadlessSimulation
+
+    if chart_hash(song_data) != replay.chart_hash:
+        raise ValueError(f"replay was recorded on a different chart than '{song_data['name']}'")
+
+    sim = simulation
+    if sim is None:
+        sim = HeadlessSimulation(song_data, score_config=score_config, judgement_windows=replay.judgement_windows)
+    else:
+        sim.reset(replay.judgement_windows)
+
+    try:
+        end_ms = replay.end_ms
+        for time_us, lane, pressed in replay.events:
+            time_ms = time_us / 1000
+            if end_ms is not None and time_ms > end_ms:
+                sim.run_until(end_ms, tick_ms)
+                sim.set_clock(time_ms)
+            else:
+                sim.run_until(time_ms, tick_ms)
+            if pressed:
+                sim.press(lane)
+            else:
+                sim.release(lane)
+        if end_ms is None:
+            end_ms = max(sim.note_mgr.chart_end_ms, sim.song_ms)
+        sim.run_until(end_ms, tick_ms)
+        return sim.result()
+    finally:
+        if simulation is None:
+            sim.close()
+
+
+def compare_results(claimed: dict, recomputed: dict) -> list[str]:
+    """Describe every field where a replay's claimed result differs from playback."""
+    mismatches = []
+    if claimed["score"] != recomputed["score"]:
+        mismatches.append(f"score: claimed {claimed['score']}, recomputed {recomputed['score']}")
+    if abs(claimed["accuracy"] - recomputed["accuracy"]) > 1e-9:
+        mismatches.append(f"accuracy: claimed {claimed['accuracy']:.4f}, recomputed {recomputed['accuracy']:.4f}")
+    for name in sorted(set(claimed["hit_counts"]) | set(recomputed["hit_counts"])):
+        claimed_count = claimed["hit_counts"].get(name, 0)
+        recomputed_count = recomputed["hit_counts"].get(name, 0)
+        if claimed_count != recomputed_count:
+            mismatches.append(f"{name}: claimed {claimed_count}, recomputed {recomputed_count}")
+    return mismatches
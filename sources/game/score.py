@@ -1,10 +1,10 @@
 from typing import Any
 from collections import defaultdict
 import arcade
-from sources.utils import bus
 
 class ScoreManager:
-    def __init__(self, config: dict[Any, int]):
+    def __init__(self, session, config: dict[Any, int]):
+        self._bus = session.bus
         self._config = config
         self._score = 0
         self._health = 50
@@ -12,8 +12,8 @@ class ScoreManager:
         self._total_notes = 0
         self._hit_counts: dict[str, int] = defaultdict(int)
         
-        bus.subscribe("player_pressed", self._player_pressed)
-        bus.subscribe("player_note_miss", self._player_note_miss)
+        self._bus.subscribe("player_pressed", self._player_pressed)
+        self._bus.subscribe("player_note_miss", self._player_note_miss)
 
     @property
     def score(self):
@@ -26,12 +26,19 @@ class ScoreManager:
     @health.setter
     def health(self, value):
         self._health = min(max(value, 0), 100)
-        accuracy = (self._good_hits / self._total_notes * 100) if self._total_notes > 0 else 0.0
-        bus.publish("score_updated", score=self._score, accuracy=accuracy)
+        self._bus.publish("score_updated", score=self._score, accuracy=self.accuracy)
+
+    @property
+    def accuracy(self):
+        return (self._good_hits / self._total_notes * 100) if self._total_notes > 0 else 0.0
+
+    @property
+    def hit_counts(self) -> dict[str, int]:
+        return dict(self._hit_counts)
 
     def on_hide_view(self):
-        bus.unsubscribe("player_pressed", self._player_pressed)
-        bus.unsubscribe("player_note_miss", self._player_note_miss)
+        self._bus.unsubscribe("player_pressed", self._player_pressed)
+        self._bus.unsubscribe("player_note_miss", self._player_note_miss)
 
     def _player_pressed(self, direction_index, note):
         if note is None:
@@ -73,11 +80,20 @@ class ScoreManager:
         self._publish_update()
 
     def _publish_update(self):
-        accuracy = (self._good_hits / self._total_notes * 100) if self._total_notes > 0 else 0.0
-        bus.publish("score_updated", score=self._score, accuracy=accuracy)
+        self._bus.publish("score_updated", score=self._score, accuracy=self.accuracy)
+
+    def snapshot(self) -> tuple:
+        return self._score, self._health, self._good_hits, self._total_notes, tuple(self._hit_counts.items())
+
+    def restore(self, state: tuple):
+        self._score, self._health, self._good_hits, self._total_notes, hit_counts = state
+        self._hit_counts.clear()
+        self._hit_counts.update(hit_counts)
+        self._publish_update()
 
     def reset(self):
         self._score = 0
+        self._health = 50
         self._good_hits = 0
         self._total_notes = 0
         self._hit_counts.clear()
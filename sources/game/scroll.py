@@ -0,0 +1,51 @@
+import bisect
+import itertools
+
+BASE_PIXELS_PER_MS = 0.45
+
+
+class ScrollVelocityMap:
+    """Song time to scroll position, for charts whose scroll speed changes mid-song.
+
+    The chart's `scrollVelocities` is a list of `{"time": ms, "multiplier": x}`;
+    from `time` on, notes scroll at `multiplier` times the chart `speed`. The
+    speed is constant between two changes, so the position is piecewise linear
+    and a table of the position at every change makes any lookup a bisect plus
+    one multiply-add. A note's distance from its receptor is then the
+    difference of two positions.
+    """
+    def __init__(self, speed: float, scroll_velocities=()):
+        self.pixels_per_ms = BASE_PIXELS_PER_MS * speed
+
+        # the first segment starts at 0 ms and also covers the lead-in before it
+        self._times = [0.0]
+        self._rates = [self.pixels_per_ms]
+        for time, multiplier in sorted((float(sv["time"]), float(sv["multiplier"])) for sv in scroll_velocities):
+            if multiplier < 0:
+                raise ValueError(f"scroll velocity at {time} ms is negative ({multiplier}); notes are spawned in time order")
+            rate = self.pixels_per_ms * multiplier
+            if time <= self._times[-1]:
+                self._rates[-1] = rate
+            else:
+                self._times.append(time)
+                self._rates.append(rate)
+
+        lengths = (rate * (end - start) for rate, start, end in zip(self._rates, self._times, self._times[1:]))
+        self._positions = list(itertools.accumulate(lengths, initial=0.0))
+
+    @property
+    def has_changes(self) -> bool:
+        return len(self._times) > 1
+
+    def position(self, song_ms: float) -> float:
+        """Pixels scrolled from 0 ms to *song_ms*, negative before the song starts."""
+        index = max(bisect.bisect_right(self._times, song_ms) - 1, 0)
+        return self._positions[index] + (song_ms - self._times[index]) * self._rates[index]
+
+    def distance(self, from_ms: float, to_ms: float) -> float:
+        """Pixels scrolled between two song times."""
+        return self.position(to_ms) - self.position(from_ms)
+
+    def rate(self, song_ms: float) -> float:
+        """Scroll speed in pixels per ms at *song_ms*."""
+        return self._rates[max(bisect.bisect_right(self._times, song_ms) - 1, 0)]
@@ -0,0 +1,53 @@
+from sources.utils.event_bus import EventBus
+
+
+class GameSession:
+    """State of one running chart, handed to every manager at construction.
+
+    Managers reach each other and publish events through the session they were
+    built with instead of process-wide globals, so several sessions can live
+    side by side in one process.
+    """
+    def __init__(self):
+        self.bus = EventBus()
+        self.song_mgr = None
+        self.note_mgr = None
+        self.score_mgr = None
+        self.receptor_mgr = None
+        self.modchart_mgr = None
+        self.snapshot_mgr = None
+        self.sfx_mgr = None
+        self.gc_mgr = None
+        self.camera_mgr = None
+        self.character_mgr = None
+        self.background_mgr = None
+        self.game_interface_mgr = None
+
+    @property
+    def song_ms(self) -> float:
+        return self.song_mgr.song_ms if self.song_mgr else 0
+
+    def seek(self, song_ms: float):
+        """Jump the running chart to *song_ms* (practice); the score keeps counting from there."""
+        self.song_mgr.seek(song_ms)
+        if self.note_mgr is not None:
+            self.note_mgr.seek(self.song_mgr.song_ms)
+        self.bus.publish("seeked", song_ms=self.song_mgr.song_ms)
+
+    def set_playback_rate(self, rate: float):
+        """Practice at *rate* times normal speed; song clock, scrolling and judgement windows follow."""
+        rate = self.song_mgr.set_playback_rate(rate)
+        if self.note_mgr is not None:
+            self.note_mgr.set_playback_rate(rate)
+        self.bus.publish("playback_rate", rate=rate)
+
+    def seek_section(self, index: int):
+        sections = self.song_mgr.sections
+        self.seek(sections[max(0, min(index, len(sections) - 1))].start)
+
+    def close(self):
+        """Detach every manager that listens for events."""
+        for mgr in (self.character_mgr, self.receptor_mgr, self.score_mgr, self.camera_mgr, self.game_interface_mgr,
+                    self.background_mgr, self.snapshot_mgr, self.sfx_mgr, self.gc_mgr):
+            if mgr is not None:
+                mgr.on_hide_view()
@@ -0,0 +1,95 @@
+import heapq
+
+from sources.audio import load_pcm
+from sources.audio.voices import VoicePool, synthesize_tone, to_voice_format
+
+DEFAULT_VOICE_COUNT = 8
+# frequency, length and decay (s) of the tones used when a sound has no file
+BUILTIN_SOUNDS = {
+    "hit": (1800, 0.04, 0.008),
+    "miss": (140, 0.15, 0.04),
+    "metronome": (1000, 0.05, 0.012),
+}
+
+
+class SfxManager:
+    """Hitsounds, miss sounds and metronome ticks played from a fixed voice pool.
+
+    `assets/config/sfx.json` names the sounds; each has `enabled`, `volume`
+    and `path` (null for the built-in tone). Every sound is loaded as PCM
+    up front. A sound is tied to the song time it belongs to: one due in the
+    future waits in a queue until `update` reaches it, and one started late
+    starts that far into its samples, so consecutive hits stay spaced
+    exactly as they were played. Nothing plays while a rewind re-simulates.
+    """
+    def __init__(self, session, sfx_data: dict):
+        self._session = session
+        self._bus = session.bus
+        self._sounds = {}
+        self._volumes = {}
+        for name, settings in sfx_data.get("sounds", {}).items():
+            if not settings.get("enabled", False):
+                continue
+            path = settings.get("path")
+            buffer = load_pcm(path) if path else synthesize_tone(*BUILTIN_SOUNDS[name])
+            self._sounds[name] = to_voice_format(buffer)
+            self._volumes[name] = settings.get("volume", 1.0)
+
+        self._voices = VoicePool(sfx_data.get("voices", DEFAULT_VOICE_COUNT))
+        self._scheduled: list[tuple[float, int, str]] = []
+        self._order = 0
+
+        self._bus.subscribe("player_pressed", self._player_pressed)
+        self._bus.subscribe("player_note_miss", self._player_note_miss)
+        self._bus.subscribe("beat", self._beat)
+        self._bus.subscribe("seeked", self._seeked)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("player_pressed", self._player_pressed)
+        self._bus.unsubscribe("player_note_miss", self._player_note_miss)
+        self._bus.unsubscribe("beat", self._beat)
+        self._bus.unsubscribe("seeked", self._seeked)
+        self._voices.delete()
+
+    @property
+    def stolen_voices(self) -> int:
+        return self._voices.stolen
+
+    def _player_pressed(self, direction_index, note):
+        if note is not None:
+            self.play("hit")
+
+    def _player_note_miss(self, note):
+        self.play("miss")
+
+    def _beat(self, beat, time):
+        self.play("metronome", self._session.song_mgr.beat_time(beat))
+
+    def _seeked(self, song_ms):
+        # whatever was queued belongs to the timeline that was left
+        self._scheduled.clear()
+
+    def play(self, name: str, song_ms: float = None):
+        """Play sound *name* lined up with *song_ms* (now by default); unknown or disabled names do nothing."""
+        if name not in self._sounds:
+            return
+        snapshot_mgr = self._session.snapshot_mgr
+        if snapshot_mgr is not None and snapshot_mgr.resimulating:
+            # a rewind replaying its inputs would otherwise sound every hit of that span at once
+            return
+        song_mgr = self._session.song_mgr
+        now = song_mgr.song_ms
+        if song_ms is not None and song_ms > now:
+            self._order += 1
+            heapq.heappush(self._scheduled, (song_ms, self._order, name))
+            return
+        late_ms = now - song_ms if song_ms is not None else 0.0
+        # song time runs playback_rate times as fast as the sound does
+        self._voices.play(self._sounds[name], self._volumes[name], late_ms / 1000 / song_mgr.playback_rate)
+
+    def update(self):
+        now = self._session.song_mgr.song_ms
+        while self._scheduled and self._scheduled[0][0] <= now:
+            song_ms, _, name = heapq.heappop(self._scheduled)
+            self.play(name, song_ms)
+        self._voices.update()
@@ -0,0 +1,80 @@
+import json
+from .note import NoteManager
+from .receptor import ReceptorManager
+from .score import ScoreManager
+from .session import GameSession
+from .song import SongManager
+
+SIMULATION_TICK_MS = 1000 / 240
+
+
+class HeadlessSimulation(GameSession):
+    """Runs a chart through the gameplay managers without a window or audio.
+
+    The song clock is a SimulatedClock advanced by `step`, so a chart can be
+    driven faster than real time (benchmarks, replay verification). Only the
+    gameplay tick runs; note positions and animations are never computed.
+    Notes are still spawned *spawn_distance* scroll pixels ahead, by default
+    as far as the 720p game view spawns them.
+    """
+    def __init__(self, song_data: dict, is_bot_play: bool = False, score_config: dict = None, judgement_windows: dict = None,
+                 spawn_distance: float = None):
+        super().__init__()
+
+        if score_config is None:
+            with open("assets/config/score.json", 'r') as f:
+                score_config = json.load(f)
+
+        self.receptor_mgr = ReceptorManager(self, song_data["receptor_name"])
+        self.note_mgr = NoteManager(self, song_data, is_bot_play=is_bot_play, judgement_windows=judgement_windows,
+                                    headless_spawn_distance=spawn_distance)
+        self.song_mgr = SongManager(self, song_data, headless=True)
+        self.score_mgr = ScoreManager(self, score_config)
+
+        self.song_mgr.play()
+
+    def reset(self, judgement_windows: dict = None):
+        """Rewind to the start of the chart, keeping the loaded assets and parsed chart."""
+        self.song_mgr.stop()
+        self.note_mgr.reset()
+        if judgement_windows is not None:
+            self.note_mgr.set_judgement_windows(judgement_windows)
+        self.score_mgr.reset()
+        self.song_mgr.play()
+
+    def step(self, delta_ms: float = SIMULATION_TICK_MS):
+        """Advance the clock by *delta_ms* and run one gameplay tick."""
+        self.song_mgr.inst_player.advance(delta_ms)
+        self.song_mgr.update()
+        self.note_mgr.fixed_update(delta_ms / 1000)
+
+    def set_clock(self, song_ms: float):
+        """Set the clock to exactly *song_ms* without a gameplay tick."""
+        self.song_mgr.inst_player.ms = song_ms
+        self.song_mgr.update()
+
+    def advance_to(self, song_ms: float):
+        """Set the clock to exactly *song_ms* and run one gameplay tick."""
+        delta_ms = song_ms - self.song_ms
+        self.song_mgr.inst_player.ms = song_ms
+        self.song_mgr.update()
+        self.note_mgr.fixed_update(delta_ms / 1000)
+
+    def run_until(self, end_ms: float, tick_ms: float = SIMULATION_TICK_MS):
+        while self.song_ms + tick_ms < end_ms:
+            self.step(tick_ms)
+        if self.song_ms < end_ms:
+            self.advance_to(end_ms)
+
+    def press(self, direction_index: int):
+        self.note_mgr.on_key_press(direction_index)
+
+    def release(self, direction_index: int):
+        self.note_mgr.on_key_release(direction_index)
+
+    def result(self) -> dict:
+        return {
+            "score": self.score_mgr.score,
+            "accuracy": self.score_mgr.accuracy,
+            "hit_counts": self.score_mgr.hit_counts,
+        }
@@ -1,21 +1,20 @@
 import arcade
 import json
-from sources.utils import *
+from sources.utils import load_animation_variant
+from .camera import max_world_zoom
 
 IDLE_DELAY = .1
 
 class SingerCharacterManager:
-    def __init__(self, song_data, background_data):
-        self.player     = SingerCharacter(song_data["player_name"],
-                                            background_data["player"]["position"][0], background_data["player"]["position"][1],
-                                            background_data["player"]["scale"])
-        self.opponent   = SingerCharacter(song_data["opponent_name"],
-                                            background_data["opponent"]["position"][0], background_data["opponent"]["position"][1],
-                                            background_data["opponent"]["scale"])
+    def __init__(self, session, song_data, background_data):
+        self._session = session
+        self._bus = session.bus
+        self._background_data = background_data
+        self._zoom = max_world_zoom(background_data)
+        self.player     = self._create_character("player", song_data["player_name"])
+        self.opponent   = self._create_character("opponent", song_data["opponent_name"])
         if not (song_data["sub_character_name"] is None) and not (song_data["sub_character_name"] == ""):
-            self.sub_character = SingerCharacter(song_data["sub_character_name"],
-                                      background_data["sub_character"]["position"][0], background_data["sub_character"]["position"][1],
-                                    background_data["sub_character"]["scale"])
+            self.sub_character = self._create_character("sub_character", song_data["sub_character_name"])
         
         self._character_spritelist = arcade.SpriteList()
         self._character_spritelist.append(self.player)
@@ -26,33 +25,77 @@ class SingerCharacterManager:
         self._should_opponent_go_idle = True
         self._player_idle_timer = 0.0
         self._opponent_idle_timer = 0.0
-
-        bus.subscribe("beat", self._beat)
-        bus.subscribe("player_pressed", self._note_pressed)
-        bus.subscribe("opponent_pressed", self._note_pressed)
-        bus.subscribe("player_released", self._player_released)
-        bus.subscribe("opponent_released", self._opponent_released)
+        self._alt_section = False
+        self._prefetched = {}
+        # set whenever a character changed frame, animation or place since the world layer was last drawn; the view clears it
+        self.dirty = True
+        self._frame_state = None
+
+        self._bus.subscribe("beat", self._beat)
+        self._bus.subscribe("player_pressed", self._note_pressed)
+        self._bus.subscribe("opponent_pressed", self._note_pressed)
+        self._bus.subscribe("player_released", self._player_released)
+        self._bus.subscribe("opponent_released", self._opponent_released)
+        self._bus.subscribe("chart_event:alt_animation", self._alt_animation)
+        self._bus.subscribe("chart_prefetch:character_swap", self._prefetch_character)
+        self._bus.subscribe("chart_event:character_swap", self._swap_character)
 
     def on_hide_view(self):
-        bus.unsubscribe("beat", self._beat)
-        bus.unsubscribe("player_pressed", self._note_pressed)
-        bus.unsubscribe("opponent_pressed", self._note_pressed)
-        bus.unsubscribe("player_released", self._player_released)
-        bus.unsubscribe("opponent_released", self._opponent_released)
+        self._bus.unsubscribe("beat", self._beat)
+        self._bus.unsubscribe("player_pressed", self._note_pressed)
+        self._bus.unsubscribe("opponent_pressed", self._note_pressed)
+        self._bus.unsubscribe("player_released", self._player_released)
+        self._bus.unsubscribe("opponent_released", self._opponent_released)
+        self._bus.unsubscribe("chart_event:alt_animation", self._alt_animation)
+        self._bus.unsubscribe("chart_prefetch:character_swap", self._prefetch_character)
+        self._bus.unsubscribe("chart_event:character_swap", self._swap_character)
+
+    def snapshot(self) -> tuple:
+        """Animations and idle state; character swaps are not part of it, a seek publishes the one in effect again."""
+        return (self.player.current_animation_name, self.opponent.current_animation_name,
+                self._should_player_go_idle, self._should_opponent_go_idle,
+                self._player_idle_timer, self._opponent_idle_timer, self._alt_section)
+
+    def restore(self, state: tuple):
+        player_animation, opponent_animation, *flags = state
+        (self._should_player_go_idle, self._should_opponent_go_idle,
+         self._player_idle_timer, self._opponent_idle_timer, self._alt_section) = flags
+        self.player.play_animation(player_animation)
+        self.opponent.play_animation(opponent_animation)
+
+    def _create_character(self, role: str, name: str) -> 'SingerCharacter':
+        position = self._background_data[role]["position"]
+        return SingerCharacter(name, position[0], position[1], self._background_data[role]["scale"], self._zoom)
+
+    def _alt_animation(self, time, enabled):
+        self._alt_section = enabled
+
+    def _prefetch_character(self, time, role, name):
+        """Load a swapped-in character ahead of its swap so the swap itself is only a sprite exchange."""
+        if (role, name) not in self._prefetched and getattr(self, role).name != name:
+            self._prefetched[(role, name)] = self._create_character(role, name)
+
+    def _swap_character(self, time, role, name):
+        old = getattr(self, role)
+        if old.name == name:
+            return
+        character = self._prefetched.pop((role, name), None) or self._create_character(role, name)
+        # kept, so seeking back across the swap is a sprite exchange too
+        self._prefetched[(role, old.name)] = old
+        self._character_spritelist[self._character_spritelist.index(old)] = character
+        setattr(self, role, character)
 
     def _note_pressed(self, direction_index, note):
         if note is None:
             return
-        from sources.views import MainGameView
-
         anim = ["sing_left", "sing_down", "sing_up", "sing_right"][direction_index % 4]
         if direction_index < 4:
-            if f"{anim}_alt" in self.player.loaded_animations and (getattr(note, "note_type", "") == "alt_animation" or MainGameView.current.song_mgr.current_section_data.get("altAnim", False)):
+            if f"{anim}_alt" in self.player.loaded_animations and (getattr(note, "note_type", "") == "alt_animation" or self._alt_section):
                 anim = f"{anim}_alt"
             self.player.play_animation(anim)
             self._should_player_go_idle = False
         if direction_index >= 4:
-            if f"{anim}_alt" in self.opponent.loaded_animations and (getattr(note, "note_type", "") == "alt_animation" or MainGameView.current.song_mgr.current_section_data.get("altAnim", False)):
+            if f"{anim}_alt" in self.opponent.loaded_animations and (getattr(note, "note_type", "") == "alt_animation" or self._alt_section):
                 anim = f"{anim}_alt"
             self.opponent.play_animation(anim)
             self._should_opponent_go_idle = False
@@ -92,23 +135,32 @@ class SingerCharacterManager:
         self._character_spritelist.update(delta_time)
         self._character_spritelist.update_animation(delta_time)
 
+        frame_state = tuple((sprite.texture, sprite.center_x, sprite.center_y, sprite.scale_x)
+                            for sprite in self._character_spritelist)
+        if frame_state != self._frame_state:
+            self._frame_state = frame_state
+            self.dirty = True
+
     def draw(self):
         self._character_spritelist.draw()
 
 class SingerCharacter(arcade.TextureAnimationSprite):
-    def __init__(self, name : str, center_x : float, center_y : float, scale : float):
+    def __init__(self, name : str, center_x : float, center_y : float, scale : float, stage_zoom : float = 1.0):
         with open(f"assets/characters/{name}/data.json", 'r', encoding='utf-8') as f:
             self._data : dict = json.load(f)
 
         self.name = name
-        self.loaded_animations = {
-            anim_name: arcade.load_animated_gif(self._data["animations"][anim_name]["path"]).animation
-            for anim_name in self._data.get("animations", {})
-        }
+        # gifs come in baked resolutions; each animation is drawn at base scale / its resolution factor
+        self._base_scale = scale * self._data["scale"]
+        self.loaded_animations = {}
+        self._animation_factors = {}
+        for anim_name in self._data.get("animations", {}):
+            self.loaded_animations[anim_name], self._animation_factors[anim_name] = load_animation_variant(
+                self._data["animations"][anim_name]["path"], self._base_scale * stage_zoom)
 
         self.current_animation_name = None
         self._should_loop = False
-        super().__init__(center_x, center_y, scale * self._data["scale"], None)
+        super().__init__(center_x, center_y, self._base_scale, None)
         self.play_animation("idle")
 
     @property
@@ -127,6 +179,7 @@ class SingerCharacter(arcade.TextureAnimationSprite):
         self._current_keyframe_index = 0
         self.current_animation_name = name
         self.animation = self.loaded_animations[self.current_animation_name]
+        self.scale = self._base_scale / self._animation_factors[self.current_animation_name]
         self._should_loop = self._data["animations"][self.current_animation_name].get("loop", False)
         
         self.center_x += self._data["animations"][self.current_animation_name].get("offset", [0, 0])[0]
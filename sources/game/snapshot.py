@@ -0,0 +1,131 @@
+import collections
+import time
+
+SNAPSHOT_CAPACITY = 64
+RESIMULATION_TICK_MS = 1000 / 120
+DEFAULT_REWIND_MS = 3000
+
+
+class Snapshot:
+    """Gameplay state at one song time, as each manager's compact snapshot tuple."""
+    def __init__(self, song_ms: float, notes: tuple, score: tuple, camera: tuple | None, characters: tuple | None):
+        self.song_ms = song_ms
+        self.notes = notes
+        self.score = score
+        self.camera = camera
+        self.characters = characters
+
+
+class SnapshotManager:
+    """Takes a snapshot every `interval_beats` beats and rewinds to any time after the oldest one.
+
+    Snapshots hold arrays and tuples, never sprites, so taking one costs
+    microseconds. Player inputs are logged alongside; a rewind restores the
+    latest snapshot at or before the target and replays the logged inputs up
+    to the target at the fixed logic tick, so hits and misses come out as
+    they did the first time.
+    """
+    def __init__(self, session, interval_beats: int = 1, capacity: int = SNAPSHOT_CAPACITY):
+        self._session = session
+        self._bus = session.bus
+        self._interval_beats = interval_beats
+        self._snapshots: collections.deque[Snapshot] = collections.deque(maxlen=capacity)
+        self._inputs: collections.deque[tuple[int, int, bool]] = collections.deque()
+        self._resimulating = False
+        self.worst_snapshot_ms = 0.0
+
+        self._bus.subscribe("beat", self._beat)
+        self._bus.subscribe("player_input", self._player_input)
+
+    def on_hide_view(self):
+        self._bus.unsubscribe("beat", self._beat)
+        self._bus.unsubscribe("player_input", self._player_input)
+
+    @property
+    def resimulating(self) -> bool:
+        """True while a rewind replays inputs up to its target; what is published then was already heard and seen."""
+        return self._resimulating
+
+    def _beat(self, beat, time):
+        if beat % self._interval_beats == 0:
+            self.take()
+
+    def _player_input(self, direction_index, time_us, pressed):
+        if not self._resimulating:
+            self._inputs.append((time_us, direction_index, pressed))
+
+    def take(self) -> Snapshot:
+        started = time.perf_counter()
+        session = self._session
+        snapshot = Snapshot(
+            session.song_mgr.song_ms,
+            session.note_mgr.snapshot(),
+            session.score_mgr.snapshot(),
+            session.camera_mgr.snapshot() if session.camera_mgr is not None else None,
+            session.character_mgr.snapshot() if session.character_mgr is not None else None,
+        )
+        self._snapshots.append(snapshot)
+        # inputs older than every snapshot can't be replayed anymore
+        oldest_us = self._snapshots[0].song_ms * 1000
+        while self._inputs and self._inputs[0][0] <= oldest_us:
+            self._inputs.popleft()
+        self.worst_snapshot_ms = max(self.worst_snapshot_ms, (time.perf_counter() - started) * 1000)
+        return snapshot
+
+    def rewind(self, target_ms: float) -> bool:
+        """Go back to *target_ms*; False when no snapshot is that old."""
+        snapshot = None
+        for candidate in reversed(self._snapshots):
+            if candidate.song_ms <= target_ms:
+                snapshot = candidate
+                break
+        if snapshot is None:
+            return False
+
+        session = self._session
+        song_mgr = session.song_mgr
+        was_paused = song_mgr.paused
+        song_mgr.pause()
+
+        # later snapshots and inputs belong to the timeline being thrown away
+        while self._snapshots and self._snapshots[-1] is not snapshot:
+            self._snapshots.pop()
+        target_us = target_ms * 1000
+        inputs = [event for event in self._inputs if snapshot.song_ms * 1000 < event[0] <= target_us]
+        while self._inputs and self._inputs[-1][0] > snapshot.song_ms * 1000:
+            self._inputs.pop()
+
+        session.note_mgr.restore(snapshot.notes)
+        session.score_mgr.restore(snapshot.score)
+        if snapshot.camera is not None:
+            session.camera_mgr.restore(snapshot.camera)
+        if snapshot.characters is not None:
+            session.character_mgr.restore(snapshot.characters)
+
+        self._resimulate(snapshot.song_ms, target_ms, inputs)
+        if not was_paused:
+            song_mgr.resume()
+        self._bus.publish("seeked", song_ms=target_ms)
+        return True
+
+    def _resimulate(self, start_ms: float, target_ms: float, inputs: list):
+        """Run the gameplay tick from *start_ms* to *target_ms* on the paused clock, feeding *inputs* back in."""
+        song_mgr, note_mgr = self._session.song_mgr, self._session.note_mgr
+        self._resimulating = True
+        pending = collections.deque(inputs)
+        song_ms = start_ms
+        song_mgr.hold_at(song_ms)
+        while song_ms < target_ms:
+            tick_ms = min(song_ms + RESIMULATION_TICK_MS, target_ms)
+            while pending and pending[0][0] <= tick_ms * 1000:
+                time_us, lane, pressed = pending.popleft()
+                song_mgr.hold_at(time_us / 1000)
+                (note_mgr.on_key_press if pressed else note_mgr.on_key_release)(lane)
+            song_mgr.hold_at(tick_ms)
+            note_mgr.fixed_update((tick_ms - song_ms) / 1000)
+            song_ms = tick_ms
+        # beats, steps and chart events resume from the target without firing what was skipped
+        song_mgr.seek(target_ms)
+        self._resimulating = False
+        # logged again from the replay above, in order
+        self._inputs.extend(inputs)
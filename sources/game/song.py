@@ -1,16 +1,58 @@
+import bisect
+import pathlib
+
 import arcade
-from sources.utils.event_bus import bus
+import pyglet
+from sources.audio import PcmSource, RatePlayback, StemSync, load_pcm, MIN_PLAYBACK_RATE, MAX_PLAYBACK_RATE
+from .chart_events import ChartEventTimeline
+
+
+class SimulatedClock:
+    """Stands in for the inst player when a chart is simulated without audio."""
+    def __init__(self, start_ms: float = 0):
+        self.ms = start_ms
+        self.source = None
+
+    @property
+    def time(self) -> float:
+        return self.ms / 1000
+
+    def advance(self, delta_ms: float):
+        self.ms += delta_ms
+
+
+class Section:
+    """One chart section on the song timeline; *bpm* is set only on sections that change it."""
+    __slots__ = ("start", "end", "must_hit", "alt_animation", "bpm")
+
+    def __init__(self, start: float, end: float, must_hit: bool, alt_animation: bool, bpm: float = None):
+        self.start = start
+        self.end = end
+        self.must_hit = must_hit
+        self.alt_animation = alt_animation
+        self.bpm = bpm
 
 
 class SongManager:
-    def __init__(self, song_data: dict):
+    def __init__(self, session, song_data: dict, headless: bool = False):
+        self._bus = session.bus
         self._song_data = song_data
+        self.headless = headless
 
-        self._inst_sound = arcade.load_sound(song_data["inst_path"])
-        self._voices_sound = arcade.load_sound(song_data["voices_path"])
+        # memory-mapped from the PCM cache: nothing is decoded here once a song has been played before
+        self._inst_pcm = None if headless else self._load_stem(song_data["inst_path"])
+        self._voices_pcm = None if headless else self._load_stem(song_data["voices_path"])
+        if not headless and self._inst_pcm is None and self._voices_pcm is None:
+            raise FileNotFoundError(f"{song_data['name']}: neither {song_data['inst_path']} nor {song_data['voices_path']} exists")
 
+        # with one stem missing the other one plays alone and keeps the time
         self.inst_player = None
         self.voices_player = None
+        self.playback_rate = 1.0
+        self.sync = StemSync()
+        # measured by the calibration view; real-time milliseconds, see set_offsets
+        self.audio_offset_ms = 0.0
+        self.visual_offset_ms = 0.0
 
         self.music_playing = False
         self._paused = False
@@ -20,67 +62,168 @@ class SongManager:
         self._last_step = -1
 
         self.sections = self._build_section_timeline()
+        self._section_starts = [sec.start for sec in self.sections]
         self._beat_times, self._step_times = self._build_time_timeline()
+        self.events = ChartEventTimeline(self._bus, song_data, self.sections)
+
+    @staticmethod
+    def _load_stem(path):
+        return load_pcm(path) if path and pathlib.Path(path).exists() else None
 
     @property
     def song_ms(self):
-        if not self.inst_player:
+        if self._paused:
+            return self._pause_time
+        player = self.inst_player or self.voices_player
+        if not player:
             return 0
-        return self.inst_player.time * 1000
+        return player.time * 1000 - self._audio_latency_ms
+
+    @property
+    def visual_ms(self):
+        """Song time to draw the playfield at: ahead of song_ms by the visual offset."""
+        return self.song_ms + self.visual_offset_ms * self.playback_rate
+
+    @property
+    def _audio_latency_ms(self):
+        # song milliseconds pass playback_rate times as fast as real ones
+        return self.audio_offset_ms * self.playback_rate
+
+    def set_offsets(self, audio_offset_ms: float, visual_offset_ms: float):
+        """Latency compensation from calibration.
+
+        *audio_offset_ms* is how late taps land against what is heard: the song
+        clock runs that far behind the players, so judgement and beats follow
+        the audio as heard. *visual_offset_ms* is how late taps land against
+        what is seen; the playfield is drawn that far ahead of the song clock.
+        """
+        song_ms = self.song_ms
+        self.audio_offset_ms = audio_offset_ms
+        self.visual_offset_ms = visual_offset_ms
+        if self.music_playing and not self._paused:
+            self.seek(song_ms)
+
+    @property
+    def paused(self):
+        return self._paused
+
+    @property
+    def duration_ms(self) -> float:
+        """Length of the longer loaded stem; 0 when there is no audio (headless)."""
+        stems = [pcm.duration for pcm in (self._inst_pcm, self._voices_pcm) if pcm is not None]
+        return max(stems) * 1000 if stems else 0.0
+
+    def section_index(self, song_ms: float) -> int:
+        """Index of the section playing at *song_ms*, -1 outside the chart."""
+        index = bisect.bisect_right(self._section_starts, song_ms) - 1
+        if index < 0 or song_ms >= self.sections[index].end:
+            return -1
+        return index
+
+    def beat_time(self, beat: int) -> float:
+        """Song time of beat number *beat*, as counted by the `beat` event."""
+        return self._beat_times[beat]
 
     @property
     def is_player_turn(self):
-        t = self.song_ms
-        for sec in self.sections:
-            if sec["start"] <= t < sec["end"]:
-                return sec["mustHit"]
-        return False
+        index = self.section_index(self.song_ms)
+        return self.sections[index].must_hit if index >= 0 else False
 
     @property
-    def current_section_data(self):
-        t = self.song_ms
-        for sec in self.sections:
-            if sec["start"] <= t < sec["end"]:
-                return sec["data"]
-        return None
+    def current_section(self) -> Section | None:
+        index = self.section_index(self.song_ms)
+        return self.sections[index] if index >= 0 else None
 
     def update(self):
         if not self.music_playing:
             return
 
+        if self.inst_player and self.voices_player:
+            self.sync.update(self.inst_player, self.voices_player)
+
         t = self.song_ms
 
+        # before beats, so a beat on a section start already sees that section's focus
+        self.events.update(t)
+
         for i in range(self._last_step + 1, len(self._step_times)):
             if t >= self._step_times[i]:
                 self._last_step = i
-                bus.publish("step", step=i, time=t)
+                self._bus.publish("step", step=i, time=t)
             else:
                 break
 
         for i in range(self._last_beat + 1, len(self._beat_times)):
             if t >= self._beat_times[i]:
                 self._last_beat = i
-                bus.publish("beat", beat=i, time=t)
+                self._bus.publish("beat", beat=i, time=t)
             else:
                 break
 
-    def play(self):
+    def play(self, start_ms: float = 0):
         if self.music_playing:
             return
 
-        self.inst_player = arcade.play_sound(self._inst_sound)
-        self.voices_player = arcade.play_sound(self._voices_sound)
+        self._start_players(start_ms)
 
         self.music_playing = True
         self._paused = False
         self._last_beat = -1
         self._last_step = -1
+        self.events.reset()
+        if start_ms > 0:
+            self._seek_timeline(start_ms)
+
+    def seek(self, song_ms: float):
+        """Jump to *song_ms*, playing or paused.
+
+        Beat and step counters and the chart event cursor are moved by binary
+        search, so nothing that lies before *song_ms* fires; both audio players
+        are seeked to the same timestamp.
+        """
+        song_ms = max(0.0, song_ms)
+        self._seek_timeline(song_ms)
+        if self._paused:
+            self._pause_time = song_ms
+        elif self.headless:
+            self.inst_player.ms = song_ms + self._audio_latency_ms
+        else:
+            for player in (self.inst_player, self.voices_player):
+                if player:
+                    player.seek(max(0.0, song_ms + self._audio_latency_ms) / 1000)
+            self.sync.reset()
+
+    def hold_at(self, song_ms: float):
+        """Move the paused clock without touching audio, beats or chart events (re-simulation)."""
+        if self._paused:
+            self._pause_time = song_ms
+
+    def set_playback_rate(self, rate: float) -> float:
+        """Play the song *rate* times as fast (practice), clamped to the supported range; returns the rate set.
+
+        The song clock keeps counting chart milliseconds, so it runs *rate*
+        times as fast as the wall clock.
+        """
+        rate = min(max(rate, MIN_PLAYBACK_RATE), MAX_PLAYBACK_RATE)
+        if rate == self.playback_rate:
+            return rate
+        restart = self.music_playing and not self._paused
+        song_ms = self.song_ms
+        if restart:
+            self._stop_players()
+        self.playback_rate = rate
+        if restart:
+            self._start_players(song_ms)
+        return rate
+
+    def _seek_timeline(self, song_ms: float):
+        # a beat exactly at song_ms counts as played, like it would in update
+        self._last_step = bisect.bisect_right(self._step_times, song_ms) - 1
+        self._last_beat = bisect.bisect_right(self._beat_times, song_ms) - 1
+        self.events.seek(song_ms)
 
     def stop(self):
-        if self.inst_player:
-            arcade.stop_sound(self.inst_player)
-        if self.voices_player:
-            arcade.stop_sound(self.voices_player)
+        self._stop_players()
 
         self.inst_player = None
         self.voices_player = None
@@ -95,8 +238,7 @@ class SongManager:
             return
 
         self._pause_time = self.song_ms
-        arcade.stop_sound(self.inst_player)
-        arcade.stop_sound(self.voices_player)
+        self._stop_players()
 
         self._paused = True
 
@@ -104,19 +246,50 @@ class SongManager:
         if not self._paused:
             return
 
-        self.inst_player = arcade.play_sound(
-            self._inst_sound,
-            start=self._pause_time / 1000
-        )
-
-        self.voices_player = arcade.play_sound(
-            self._voices_sound,
-            start=self._pause_time / 1000
-        )
-
+        self._start_players(self._pause_time)
         self._paused = False
         self.music_playing = True
 
+    def _start_players(self, start_ms: float):
+        # the players run ahead of the song clock by the audio latency
+        start_ms += self._audio_latency_ms
+        if self.headless:
+            self.inst_player = SimulatedClock(start_ms)
+            return
+
+        self.sync.reset()
+        if self.playback_rate != 1.0:
+            # both stems are mixed into the one stream of a RatePlayback, which keeps them locked together
+            stems = [buffer for buffer in (self._inst_pcm, self._voices_pcm) if buffer is not None]
+            self.inst_player = RatePlayback(stems, self.playback_rate, max(0.0, start_ms) / 1000)
+            self.voices_player = None
+            return
+
+        self.inst_player = self._open_player(self._inst_pcm, start_ms)
+        self.voices_player = self._open_player(self._voices_pcm, start_ms)
+        pyglet.media.PlayerGroup([player for player in (self.inst_player, self.voices_player) if player]).play()
+
+    @staticmethod
+    def _open_player(buffer, start_ms: float):
+        if buffer is None:
+            return None
+        player = pyglet.media.Player()
+        player.queue(PcmSource(buffer))
+        # a frame index into the mapped samples, so seeking before play is free and sample-exact
+        player.seek(max(0.0, start_ms) / 1000)
+        return player
+
+    def _stop_players(self):
+        if self.headless:
+            return
+        if isinstance(self.inst_player, RatePlayback):
+            self.inst_player.stop()
+            return
+        if self.inst_player:
+            arcade.stop_sound(self.inst_player)
+        if self.voices_player:
+            arcade.stop_sound(self.voices_player)
+
     def _build_section_timeline(self):
         base_bpm = self._song_data["bpm"]
         current_bpm = base_bpm
@@ -126,18 +299,16 @@ class SongManager:
 
         for sec in self._song_data["notes"]:
 
-            if sec.get("changeBPM", False):
+            change_bpm = sec.get("changeBPM", False)
+            if change_bpm:
                 current_bpm = sec.get("bpm", current_bpm)
 
             step_ms = (60000 / current_bpm) / 4
             length_ms = sec.get("lengthInSteps", 16) * step_ms
 
-            sections.append({
-                "start": current_time,
-                "end": current_time + length_ms,
-                "mustHit": sec["mustHitSection"],
-                "data": sec
-            })
+            # only what the timeline needs, not the chart section with its notes
+            sections.append(Section(current_time, current_time + length_ms, sec["mustHitSection"],
+                                    sec.get("altAnim", False), current_bpm if change_bpm else None))
 
             current_time += length_ms
 
@@ -1 +1,7 @@
-from .event_bus import bus
\ No newline at end of file
+from .event_bus import EventBus
+from .asset_cache import load_texture, load_animation, load_texture_variant, load_animation_variant, pick_variant
+from .render_layer import RenderLayer
+from .frame_scheduler import FrameScheduler
+from .gc_monitor import GcMonitor
+from .bitmap_font import BitmapFont, BitmapText, load_bitmap_font
+from .streaming_animation import StreamingAnimationSprite
\ No newline at end of file
@@ -0,0 +1,75 @@
+"""Process-wide cache of decoded textures and animations.
+
+Every game session in the process shares these, so starting another chart
+(or another simulated session) does not decode the same files again.
+
+bake_assets.py writes reduced copies next to the originals (`idle@0.5x.gif`);
+the *_variant loaders pick the smallest one that is still sharp at the scale
+a sprite is actually shown at. A variant older than its original is stale
+and skipped, so an edited sprite shows up before it is baked again.
+"""
+import pathlib
+
+import arcade
+
+VARIANT_FACTORS = (0.5, 0.25)
+
+_textures: dict[str, arcade.Texture] = {}
+_animations: dict[str, arcade.TextureAnimation] = {}
+
+
+def load_texture(path) -> arcade.Texture:
+    key = str(path)
+    if key not in _textures:
+        _textures[key] = arcade.load_texture(key)
+    return _textures[key]
+
+
+def load_animation(path) -> arcade.TextureAnimation:
+    """Decode a gif into a TextureAnimation; sprites keep their own playback time so it can be shared."""
+    key = str(path)
+    if key not in _animations:
+        _animations[key] = arcade.load_animated_gif(key).animation
+    return _animations[key]
+
+
+def variant_path(path, factor: float) -> pathlib.Path:
+    path = pathlib.Path(path)
+    return path.with_name(f"{path.stem}@{factor:g}x{path.suffix}")
+
+
+def is_current(variant: pathlib.Path, path) -> bool:
+    """True when *variant* exists and was baked after its original was last changed."""
+    return variant.exists() and variant.stat().st_mtime >= pathlib.Path(path).stat().st_mtime
+
+
+def pick_variant(path, effective_scale: float) -> tuple[pathlib.Path, float]:
+    """Smallest baked variant with at least one texel per screen pixel at *effective_scale*, else the original.
+
+    Returns the path to load and its resolution factor; the sprite scale has to be divided by that factor.
+    """
+    picked = (pathlib.Path(path), 1.0)
+    for factor in sorted(VARIANT_FACTORS, reverse=True):
+        if factor < effective_scale:
+            break
+        candidate = variant_path(path, factor)
+        if is_current(candidate, path):
+            picked = (candidate, factor)
+        elif candidate.exists():
+            print(f"[assets] {candidate} is older than {path}; loading the original, run bake_assets.py")
+    return picked
+
+
+def load_texture_variant(path, effective_scale: float) -> tuple[arcade.Texture, float]:
+    variant, factor = pick_variant(path, effective_scale)
+    return load_texture(variant), factor
+
+
+def load_animation_variant(path, effective_scale: float) -> tuple[arcade.TextureAnimation, float]:
+    variant, factor = pick_variant(path, effective_scale)
+    return load_animation(variant), factor
+
+
+def clear():
+    _textures.clear()
+    _animations.clear()
@@ -0,0 +1,142 @@
+"""Bitmap text for HUD values that change often (score, accuracy, time, judgements, FPS).
+
+Every glyph and label is rasterized once into the default texture atlas; after
+that, changing a BitmapText only swaps textures and positions of pooled sprites.
+"""
+import arcade
+import pyglet
+
+DIGITS = "0123456789"
+DEFAULT_FONT = ("calibri", "arial")
+
+_fonts: dict[tuple, 'BitmapFont'] = {}
+
+
+class BitmapFont:
+    def __init__(self, font_name=DEFAULT_FONT, font_size: float = 12, bold: bool = False, charset: str = DIGITS, labels=()):
+        self.font_name = font_name
+        self.font_size = font_size
+        self.bold = bold
+
+        font = pyglet.font.load(font_name, font_size, weight="bold" if bold else "normal")
+        self.line_height = font.ascent - font.descent
+        self.descent = -font.descent
+        self.space_width = self._measure("0 0") - self._measure("00")
+
+        self._glyphs: dict[str, arcade.Texture] = {}
+        self._labels: dict[str, arcade.Texture] = {}
+        for char in charset:
+            self.glyph(char)
+        for label in labels:
+            self.label(label)
+
+    def _text(self, text: str) -> arcade.Text:
+        return arcade.Text(text, 0, 0, arcade.color.WHITE, self.font_size, font_name=self.font_name, bold=self.bold)
+
+    def _measure(self, text: str) -> float:
+        return self._text(text).content_width
+
+    def _rasterize(self, text: str) -> arcade.Texture:
+        # like arcade.create_text_sprite, but that names the texture after the text alone,
+        # so the same character in two sizes would share one atlas region
+        text_object = self._text(text)
+        size = (int(text_object.right - text_object.left), int(text_object.top - text_object.bottom))
+        text_object.y = -text_object.bottom
+        texture = arcade.Texture.create_empty(f"bitmap_font:{self.font_name}:{self.font_size}:{self.bold}:{text}", size)
+
+        atlas = arcade.get_window().ctx.default_atlas
+        atlas.add(texture)
+        with atlas.render_into(texture) as fbo:
+            fbo.clear(color=arcade.color.TRANSPARENT_BLACK)
+            text_object.draw()
+        # keep the pixels on the python side too, an atlas rebuild would otherwise leave the glyph blank
+        atlas.update_texture_image_from_atlas(texture)
+        return texture
+
+    def glyph(self, char: str) -> arcade.Texture | None:
+        """Texture of a single character, None for a space. Characters outside the charset are added on first use."""
+        if char == " ":
+            return None
+        if char not in self._glyphs:
+            self._glyphs[char] = self._rasterize(char)
+        return self._glyphs[char]
+
+    def label(self, text: str) -> arcade.Texture:
+        """A whole word in one texture, kerned like regular text."""
+        if text not in self._labels:
+            self._labels[text] = self._rasterize(text)
+        return self._labels[text]
+
+
+def load_bitmap_font(font_name=DEFAULT_FONT, font_size: float = 12, bold: bool = False,
+                     charset: str = DIGITS, labels=()) -> BitmapFont:
+    """Shared BitmapFont per font, size and weight; extra charset and labels are rasterized into it."""
+    key = (font_name if isinstance(font_name, str) else tuple(font_name), font_size, bold)
+    if key not in _fonts:
+        _fonts[key] = BitmapFont(font_name, font_size, bold)
+    font = _fonts[key]
+    for char in charset:
+        font.glyph(char)
+    for label in labels:
+        font.label(label)
+    return font
+
+
+class BitmapText:
+    """One line of text drawn as a sprite per glyph, anchored like arcade.Text."""
+    def __init__(self, font: BitmapFont, text: str = "", x: float = 0, y: float = 0,
+                 color=arcade.color.WHITE, anchor_x: str = "left", anchor_y: str = "baseline"):
+        self._font = font
+        self.x = x
+        self.y = y
+        self._color = color
+        self.anchor_x = anchor_x
+        self.anchor_y = anchor_y
+        self.content_width = 0
+
+        self._sprites = arcade.SpriteList()
+        self._text = None
+        self.text = text
+
+    @property
+    def text(self) -> str:
+        return self._text
+
+    @text.setter
+    def text(self, value: str):
+        if value == self._text:
+            return
+        self._text = value
+        self._layout()
+
+    def _layout(self):
+        font = self._font
+        glyphs = [font.glyph(char) for char in self._text]
+        self.content_width = sum(font.space_width if tex is None else tex.width for tex in glyphs)
+
+        pen_x = self.x - {"left": 0, "center": self.content_width / 2, "right": self.content_width}[self.anchor_x]
+        bottom = self.y - {"bottom": 0, "baseline": font.descent, "center": font.line_height / 2,
+                           "top": font.line_height}[self.anchor_y]
+
+        visible = [tex for tex in glyphs if tex is not None]
+        while len(self._sprites) < len(visible):
+            self._sprites.append(arcade.Sprite(visible[len(self._sprites)]))
+
+        index = 0
+        for tex in glyphs:
+            if tex is None:
+                pen_x += font.space_width
+                continue
+            sprite = self._sprites[index]
+            sprite.texture = tex
+            # left/bottom go through the hit box, which keeps the size of the first texture
+            sprite.position = (pen_x + tex.width / 2, bottom + tex.height / 2)
+            sprite.color = self._color
+            sprite.visible = True
+            pen_x += tex.width
+            index += 1
+        for sprite in self._sprites[index:]:
+            sprite.visible = False
+
+    def draw(self):
+        self._sprites.draw()
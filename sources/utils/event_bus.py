@@ -1,4 +1,4 @@
-"""Simple pub/sub event bus for game-wide notifications."""
+"""Simple pub/sub event bus; every game session owns one."""
 from collections import defaultdict
 from typing import Callable, Any
 
@@ -26,8 +26,4 @@ class EventBus:
             try:
                 cb(**kwargs)
             except Exception as e:
-                print(f"EventBus listener error on '{event}': {e}")
-
-
-# a single global bus that modules can import
-bus = EventBus()
\ No newline at end of file
+                print(f"EventBus listener error on '{event}': {e}")
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""Frame pacing: draw at the display refresh rate, redraw layers only as often as they change."""
+import collections
+import time
+
+import arcade
+
+from .gc_monitor import GcMonitor
+
+DEFAULT_REFRESH_RATE = 60
+IDLE_DRAW_RATE = 10
+STATIC_WORLD_RATE = 30
+LATE_FRAME_FACTOR = 1.2
+# the most recent over-budget frames kept for the hitch log
+HITCH_LOG_SIZE = 64
+
+
+def display_refresh_rate(window: arcade.Window) -> float:
+    """Refresh rate of the screen the window is on, or DEFAULT_REFRESH_RATE when the OS doesn't say."""
+    try:
+        rate = window.screen.get_mode().rate
+    except Exception:
+        rate = None
+    return rate if rate else DEFAULT_REFRESH_RATE
+
+
+class FrameScheduler:
+    """Paces on_draw to the display and tells the view which layers are due.
+
+    The note layer is drawn every frame. The world layer is redrawn at
+    `world_rate` when the stage has nothing animated in it and every frame
+    otherwise; `invalidate` redraws it on the next frame regardless, which
+    the view does whenever the world camera or a character changed. While idle (paused, menus) nothing moves, so the window drops to
+    IDLE_DRAW_RATE and cached layers are composited as they are.
+
+    Given a GcMonitor, every frame over budget is logged as a hitch along
+    with the collections that ran during it.
+    """
+    def __init__(self, window: arcade.Window, static_world: bool = False, world_rate: float = STATIC_WORLD_RATE,
+                 gc_monitor: GcMonitor = None):
+        self._window = window
+        self.refresh_rate = display_refresh_rate(window)
+        self.frame_budget = 1 / self.refresh_rate
+        self._world_interval = 1 / world_rate if static_world else 0
+
+        self.idle = False
+        self._world_invalidated = True
+        self._last_world_draw = 0.0
+        self._last_frame = None
+
+        self.frames = 0
+        self.dropped_frames = 0
+        self.late_frames = 0
+        self.worst_frame = 0.0
+        self._gc_monitor = gc_monitor
+        self.hitches: collections.deque[tuple[int, float, list]] = collections.deque(maxlen=HITCH_LOG_SIZE)
+        self.hitch_count = 0
+        self.gc_hitch_count = 0
+
+        self._apply_rate(self.frame_budget)
+
+    def _apply_rate(self, interval: float):
+        # arcade requires updates to be dispatched at least as often as draws
+        self._window.set_update_rate(interval)
+        self._window.set_draw_rate(interval)
+
+    def set_idle(self, idle: bool):
+        if idle == self.idle:
+            return
+        self.idle = idle
+        self._apply_rate(1 / IDLE_DRAW_RATE if idle else self.frame_budget)
+        # the first frame after an idle stretch would otherwise count as dropped
+        self._last_frame = None
+        self.invalidate()
+
+    def invalidate(self):
+        """Force every cached layer to redraw on the next frame."""
+        self._world_invalidated = True
+
+    def begin_frame(self):
+        now = time.perf_counter()
+        collections_run = self._gc_monitor.take() if self._gc_monitor is not None else []
+        if self._last_frame is not None and not self.idle:
+            interval = now - self._last_frame
+            self.worst_frame = max(self.worst_frame, interval)
+            missed = int(interval / self.frame_budget + 0.5) - 1
+            if missed >= 1:
+                self.dropped_frames += missed
+            elif interval > self.frame_budget * LATE_FRAME_FACTOR:
+                self.late_frames += 1
+            if interval > self.frame_budget * LATE_FRAME_FACTOR:
+                self._log_hitch(interval, collections_run)
+        self._last_frame = now
+        self.frames += 1
+
+    def _log_hitch(self, interval: float, collections_run: list):
+        self.hitch_count += 1
+        if collections_run:
+            self.gc_hitch_count += 1
+        self.hitches.append((self.frames, interval * 1000, collections_run))
+
+    def hitch_log(self) -> list[str]:
+        """One line per logged hitch: frame number, its length and the collections that ran in it."""
+        lines = []
+        for frame, interval_ms, collections_run in self.hitches:
+            gc_text = ", ".join(f"gen{generation} {duration_ms:.2f} ms ({collected} freed)"
+                                for generation, duration_ms, collected in collections_run) or "no gc"
+            lines.append(f"frame {frame}: {interval_ms:.1f} ms / {self.frame_budget * 1000:.1f} ms budget, {gc_text}")
+        return lines
+
+    def world_due(self) -> bool:
+        now = time.perf_counter()
+        if self._world_invalidated or (not self.idle and now - self._last_world_draw >= self._world_interval):
+            self._world_invalidated = False
+            self._last_world_draw = now
+            return True
+        return False
+
+    def report(self) -> dict:
+        return {
+            "refresh_rate": self.refresh_rate,
+            "frames": self.frames,
+            "dropped_frames": self.dropped_frames,
+            "late_frames": self.late_frames,
+            "worst_frame_ms": self.worst_frame * 1000,
+            "hitches": self.hitch_count,
+            "gc_hitches": self.gc_hitch_count,
+        }
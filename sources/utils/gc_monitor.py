@@ -0,0 +1,47 @@
+"""Watches the cyclic garbage collector, so a slow frame can be matched with the collections that ran in it."""
+import gc
+import time
+
+
+class GcMonitor:
+    """Records every collection through gc.callbacks as (generation, duration ms, objects collected).
+
+    `take` hands over what ran since it was last called; call it once per
+    frame and each frame gets exactly the collections that happened in it.
+    """
+    def __init__(self):
+        self._started = 0.0
+        self._pending: list[tuple[int, float, int]] = []
+        self.collections = [0, 0, 0]
+        self.total_ms = 0.0
+        self.worst_ms = 0.0
+
+    def install(self):
+        if self._callback not in gc.callbacks:
+            gc.callbacks.append(self._callback)
+
+    def remove(self):
+        if self._callback in gc.callbacks:
+            gc.callbacks.remove(self._callback)
+
+    def _callback(self, phase: str, info: dict):
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        duration_ms = (time.perf_counter() - self._started) * 1000
+        generation = info["generation"]
+        self._pending.append((generation, duration_ms, info["collected"]))
+        self.collections[min(generation, 2)] += 1
+        self.total_ms += duration_ms
+        self.worst_ms = max(self.worst_ms, duration_ms)
+
+    def take(self) -> list[tuple[int, float, int]]:
+        pending, self._pending = self._pending, []
+        return pending
+
+    def report(self) -> dict:
+        return {
+            "collections": tuple(self.collections),
+            "total_ms": self.total_ms,
+            "worst_ms": self.worst_ms,
+        }
@@ -0,0 +1,69 @@
+"""Offscreen framebuffer that is redrawn only when needed and composited every frame."""
+from array import array
+from contextlib import contextmanager
+
+import arcade
+from arcade.gl import enums
+from arcade.gl import BufferDescription
+
+# (src color, dst color, src alpha, dst alpha); arcade's BLEND_PREMULTIPLIED_ALPHA is additive
+PREMULTIPLYING_BLEND = (enums.SRC_ALPHA, enums.ONE_MINUS_SRC_ALPHA, enums.ONE, enums.ONE_MINUS_SRC_ALPHA)
+COMPOSITE_BLEND = (enums.ONE, enums.ONE_MINUS_SRC_ALPHA)
+
+
+class RenderLayer:
+    def __init__(self, window: arcade.Window = None):
+        window = window or arcade.get_window()
+        self._ctx = window.ctx
+        self.size = window.get_framebuffer_size()
+
+        self.texture = self._ctx.texture(self.size, components=4)
+        self.fbo = self._ctx.framebuffer(color_attachments=[self.texture])
+        self._quad_buffer = self._ctx.buffer(reserve=16 * 4)
+        self._quad = self._ctx.geometry(
+            [BufferDescription(self._quad_buffer, "2f 2f", ["in_vert", "in_uv"])],
+            mode=self._ctx.TRIANGLE_STRIP,
+        )
+        self._quad_scale = None
+        self.dirty = True
+
+    def invalidate(self):
+        self.dirty = True
+
+    @contextmanager
+    def render(self):
+        """Redirect drawing into the layer; the previous contents are cleared."""
+        ctx = self._ctx
+        with self.fbo.activate():
+            self.fbo.clear()
+            # sprite lists reset to BLEND_DEFAULT on every draw; inside the layer that default
+            # has to keep color premultiplied and accumulate alpha, or the layer composites too faint
+            ctx.BLEND_DEFAULT = PREMULTIPLYING_BLEND
+            try:
+                yield
+            finally:
+                del ctx.BLEND_DEFAULT
+        self.dirty = False
+
+    def _write_quad(self, scale: float):
+        # full screen quad in clip space, scaled around the screen center
+        self._quad_buffer.write(array('f', [
+            -scale,  scale, 0.0, 1.0,
+            -scale, -scale, 0.0, 0.0,
+             scale,  scale, 1.0, 1.0,
+             scale, -scale, 1.0, 0.0,
+        ]))
+        self._quad_scale = scale
+
+    def draw(self, scale: float = 1.0):
+        """Composite the layer over the whole active framebuffer, zoomed by *scale* around the center."""
+        ctx = self._ctx
+        if scale != self._quad_scale:
+            self._write_quad(scale)
+        previous_blend = ctx.blend_func
+        ctx.enable(ctx.BLEND)
+        ctx.blend_func = COMPOSITE_BLEND
+        ctx.viewport = (0, 0, *self.size)
+        self.texture.use(0)
+        self._quad.render(ctx.utility_textured_quad_program)
+        ctx.blend_func = previous_blend
@@ -0,0 +1,100 @@
+"""Animated sprite that decodes its gif on a worker thread instead of keeping every frame resident."""
+import bisect
+import itertools
+import queue
+import threading
+
+import arcade
+from PIL import Image, ImageSequence
+
+DEFAULT_BUFFER_SIZE = 6
+
+
+class StreamingAnimationSprite(arcade.Sprite):
+    """Plays a looping gif through a ring buffer of decoded frames.
+
+    A worker thread decodes frames in order and blocks once `buffer_size`
+    frames are waiting, so memory is bounded by the buffer and not by the
+    frame count. Every frame is uploaded into the same atlas region, so the
+    GPU holds a single frame. If the worker falls behind, the last frame
+    stays up rather than stalling the draw thread.
+    """
+    def __init__(self, path, buffer_size: int = DEFAULT_BUFFER_SIZE, decode_scale: float = 1.0, **kwargs):
+        self._path = str(path)
+        with Image.open(self._path) as image:
+            durations = [frame.info.get("duration", 100) or 100 for frame in ImageSequence.Iterator(image)]
+            image.seek(0)
+            self.decode_size = (max(1, round(image.width * decode_scale)), max(1, round(image.height * decode_scale)))
+            first = self._decode(image)
+        self.frame_starts = list(itertools.accumulate(durations, initial=0))
+        self.duration_ms = self.frame_starts[-1]
+        self.num_frames = len(durations)
+
+        texture = arcade.Texture(first, hash=f"stream:{self._path}:{id(self)}")
+        super().__init__(texture, **kwargs)
+        self._atlas = arcade.get_window().ctx.default_atlas
+        self._atlas.add(texture)
+
+        self.time = 0.0
+        self.frame_index = 0
+        self._next_frame_time = durations[0] / 1000
+
+        self._frames = queue.Queue(maxsize=buffer_size)
+        self._stop = threading.Event()
+        self._worker = threading.Thread(target=self._decode_loop, name=f"decode {self._path}", daemon=True)
+        if self.num_frames > 1:
+            self._worker.start()
+
+    def _decode(self, image: Image.Image) -> Image.Image:
+        frame = image.convert("RGBA")
+        if frame.size != self.decode_size:
+            frame = frame.resize(self.decode_size, Image.Resampling.BILINEAR)
+        return frame
+
+    def _decode_loop(self):
+        with Image.open(self._path) as image:
+            index = 0
+            while not self._stop.is_set():
+                # frame 0 is already on screen; wrapping around rewinds the decoder
+                index = (index + 1) % self.num_frames
+                image.seek(index)
+                frame = self._decode(image)
+                while not self._stop.is_set():
+                    try:
+                        self._frames.put((index, frame), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+    def advance(self, delta_time: float) -> bool:
+        """Move the playhead; True when a new frame was uploaded."""
+        self.time += delta_time
+        if self.time < self._next_frame_time:
+            return False
+
+        time_ms = self.time * 1000 % self.duration_ms
+        target = bisect.bisect_right(self.frame_starts, time_ms) - 1
+        self._next_frame_time = self.time + (self.frame_starts[target + 1] - time_ms) / 1000
+        if target == self.frame_index:
+            return False
+
+        # frames arrive in play order; anything before the target was skipped over
+        while True:
+            try:
+                index, frame = self._frames.get_nowait()
+            except queue.Empty:
+                # decoder is behind: keep the current frame and look again next update
+                self._next_frame_time = self.time
+                return False
+            if index == target:
+                break
+
+        self.frame_index = index
+        self.texture.image_data.image = frame
+        self._atlas.update_texture_image(self.texture)
+        return True
+
+    def close(self):
+        self._stop.set()
+        if self._worker.is_alive():
+            self._worker.join(timeout=1)
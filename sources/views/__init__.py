@@ -1 +1,2 @@
-from .main_game import MainGameView
\ No newline at end of file
+from .main_game import MainGameView
+from .calibration import CalibrationView
\ No newline at end of file
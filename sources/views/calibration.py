@@ -0,0 +1,134 @@
+import arcade
+import pyglet
+
+from sources.audio import PcmSource
+from sources.game.calibration import CALIBRATION_BPM, metronome_track, robust_offset, save_offsets, tap_error
+
+PHASES = ("audio", "visual")
+WARMUP_BEATS = 4
+TAPS_PER_PHASE = 16
+FLASH_MS = 120
+PROMPTS = {
+    "audio": "Tap SPACE on every click",
+    "visual": "Tap SPACE on every flash",
+}
+
+
+class CalibrationView(arcade.View):
+    """Measures audio and visual latency by having the player tap along to a metronome.
+
+    The audio phase plays clicks with nothing on screen moving; the visual
+    phase flashes a circle on the beat with the sound muted. Each tap's
+    distance to the nearest beat of the track's own clock is an error
+    sample, and the robust offsets of both phases go into
+    assets/config/offsets.json. ENTER saves and continues to the view
+    *next_view* returns, R measures again, ESC leaves without saving.
+    """
+    def __init__(self, next_view=None):
+        super().__init__()
+        self._next_view = next_view
+        self._beat_ms = 60000 / CALIBRATION_BPM
+        # one track long enough for a phase with a few missed beats; a phase that runs out starts over
+        self._track = metronome_track(CALIBRATION_BPM, WARMUP_BEATS + TAPS_PER_PHASE * 2)
+        self._player = None
+        self._phase = 0
+        self._errors = {phase: [] for phase in PHASES}
+        self._results = None
+
+    def on_show_view(self):
+        win = self.window
+        self._title = arcade.Text("", win.width / 2, win.height - 120, arcade.color.WHITE, 28,
+                                  font_name="Paperlogy 8", anchor_x="center", anchor_y="center")
+        self._detail = arcade.Text("", win.width / 2, 120, arcade.color.LIGHT_GRAY, 16, font_name="Paperlogy 8",
+                                   anchor_x="center", anchor_y="center", multiline=True, width=win.width - 200, align="center")
+        self._start_phase(0)
+        return super().on_show_view()
+
+    def on_hide_view(self):
+        self._stop_player()
+        return super().on_hide_view()
+
+    def _start_phase(self, index: int):
+        self._phase = index
+        self._stop_player()
+        self._player = pyglet.media.Player()
+        self._player.queue(PcmSource(self._track))
+        self._player.volume = 1.0 if PHASES[index] == "audio" else 0.0
+        self._player.play()
+        self._update_text()
+
+    def _stop_player(self):
+        if self._player is not None:
+            self._player.pause()
+            self._player.delete()
+            self._player = None
+
+    @property
+    def _clock_ms(self) -> float:
+        return self._player.time * 1000
+
+    def _update_text(self):
+        if self._results is not None:
+            audio, visual = self._results["audio"], self._results["visual"]
+            self._title.text = f"Audio offset {audio['trimmed_mean_ms']:+.1f} ms   Visual offset {visual['trimmed_mean_ms']:+.1f} ms"
+            self._detail.text = (f"audio: median {audio['median_ms']:+.1f} ms, spread {audio['spread_ms']:.1f} ms\n"
+                                 f"visual: median {visual['median_ms']:+.1f} ms, spread {visual['spread_ms']:.1f} ms\n"
+                                 "ENTER to save   R to measure again   ESC to discard")
+            return
+        phase = PHASES[self._phase]
+        self._title.text = PROMPTS[phase]
+        self._detail.text = f"{len(self._errors[phase])} / {TAPS_PER_PHASE} taps   ESC to leave"
+
+    def _finish(self, save: bool):
+        self._stop_player()
+        if save:
+            save_offsets({
+                "audio_offset_ms": round(self._results["audio"]["trimmed_mean_ms"], 1),
+                "visual_offset_ms": round(self._results["visual"]["trimmed_mean_ms"], 1),
+            })
+        if self._next_view is not None:
+            self.window.show_view(self._next_view())
+
+    def on_key_press(self, key, modifiers):
+        if key == arcade.key.ESCAPE:
+            self._finish(save=False)
+            return
+        if self._results is not None:
+            if key == arcade.key.ENTER:
+                self._finish(save=True)
+            elif key == arcade.key.R:
+                self._errors = {phase: [] for phase in PHASES}
+                self._results = None
+                self._start_phase(0)
+            return
+        if key != arcade.key.SPACE:
+            return
+
+        clock_ms = self._clock_ms
+        # the warm-up beats let the player find the pulse first
+        if clock_ms < (WARMUP_BEATS - 0.5) * self._beat_ms:
+            return
+        errors = self._errors[PHASES[self._phase]]
+        errors.append(tap_error(clock_ms, self._beat_ms))
+        if len(errors) < TAPS_PER_PHASE:
+            self._update_text()
+        elif self._phase + 1 < len(PHASES):
+            self._start_phase(self._phase + 1)
+        else:
+            self._stop_player()
+            self._results = {phase: robust_offset(self._errors[phase]) for phase in PHASES}
+            self._update_text()
+
+    def on_update(self, delta_time):
+        if self._player is not None and self._clock_ms >= self._track.duration * 1000:
+            self._start_phase(self._phase)
+
+    def on_draw(self):
+        self.clear()
+        if self._player is not None and PHASES[self._phase] == "visual":
+            since_beat = self._clock_ms % self._beat_ms
+            if since_beat < FLASH_MS:
+                alpha = int(255 * (1 - since_beat / FLASH_MS))
+                arcade.draw_circle_filled(self.window.width / 2, self.window.height / 2, 120, (255, 255, 255, alpha))
+        self._title.draw()
+        self._detail.draw()
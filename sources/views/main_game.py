@@ -1,16 +1,20 @@
 import math
 import random
+import time
 
 import arcade
 import json
 from sources.game import *
+from sources.game.calibration import load_offsets
+from sources.game.snapshot import DEFAULT_REWIND_MS
 from sources.utils import *
 
-class MainGameView(arcade.View):
-    current : 'MainGameView' = None
+PLAYBACK_RATE_STEP = 0.05
 
-    def __init__(self, song_name):
+class MainGameView(arcade.View):
+    def __init__(self, song_name, start_ms: float = 0):
         super().__init__()
+        self._start_ms = start_ms
 
         with open(f"assets/songs/{song_name}/data.json", 'r') as f:
             self._song_data = json.load(f)
@@ -20,36 +24,78 @@ class MainGameView(arcade.View):
             self._background_data = json.load(f)
         with open("assets/config/judgements.json", 'r') as f:
             self._judgement_data = json.load(f)
+        with open("assets/config/sfx.json", 'r') as f:
+            self._sfx_data = json.load(f)
+        with open("assets/config/gc.json", 'r') as f:
+            self._gc_data = json.load(f)
+        self._offsets = load_offsets()
 
     def on_show_view(self):
-        MainGameView.current = self
-        
-        self.character_mgr  = SingerCharacterManager(self._song_data, self._background_data)
-        self.receptor_mgr   = ReceptorManager(self._song_data["receptor_name"])
-        self.note_mgr       = NoteManager(self._song_data, is_bot_play=False)
-        self.song_mgr       = SongManager(self._song_data)
-        self.score_mgr      = ScoreManager(self._config_data)
-        self.camera_mgr     = CameraManager(self._song_data, self._background_data)
-        self.background_mgr = BackgroundManager(self._background_data)
-        self.game_interface_mgr = GameInterfaceManager(self._song_data)
+        self.session = session = GameSession()
+
+        self.character_mgr  = session.character_mgr  = SingerCharacterManager(session, self._song_data, self._background_data)
+        self.receptor_mgr   = session.receptor_mgr   = ReceptorManager(session, self._song_data["receptor_name"])
+        self.modchart_mgr   = session.modchart_mgr   = ModchartManager(session, self._song_data)
+        self.note_mgr       = session.note_mgr       = NoteManager(session, self._song_data, is_bot_play=False)
+        self.song_mgr       = session.song_mgr       = SongManager(session, self._song_data)
+        self.song_mgr.set_offsets(self._offsets["audio_offset_ms"], self._offsets["visual_offset_ms"])
+        self.score_mgr      = session.score_mgr      = ScoreManager(session, self._config_data)
+        self.camera_mgr     = session.camera_mgr     = CameraManager(session, self._song_data, self._background_data)
+        self.background_mgr = session.background_mgr = BackgroundManager(session, self._background_data)
+        self.game_interface_mgr = session.game_interface_mgr = GameInterfaceManager(session, self._song_data)
+        self.snapshot_mgr   = session.snapshot_mgr   = SnapshotManager(session)
+        self.sfx_mgr        = session.sfx_mgr        = SfxManager(session, self._sfx_data)
+        self.replay_recorder = ReplayRecorder(session, self._song_data, self.note_mgr.judgement_windows)
+
+        self._gc_monitor = GcMonitor()
+        self._gc_monitor.install()
+        self.frame_scheduler = FrameScheduler(self.window, static_world=not self.background_mgr.has_animated_world,
+                                              gc_monitor=self._gc_monitor)
+        self._world_layer = RenderLayer(self.window)
+        self._fps_text = BitmapText(load_bitmap_font(font_size=24, charset="0123456789./: FPSdroplate"),
+                                    x=20, y=self.window.height - 20, color=arcade.color.GREEN)
+        # last, so everything loaded above is frozen out of later collections
+        self.gc_mgr         = session.gc_mgr         = GcManager(session, self._gc_data)
 
         self.song_mgr.play()
+        if self._start_ms > 0:
+            session.seek(self._start_ms)
 
         self._start_pos = arcade.get_window().get_location()
 
         return super().on_show_view()
     
     def on_hide_view(self):
-        self.character_mgr.on_hide_view()
-        self.receptor_mgr.on_hide_view()
-        self.score_mgr.on_hide_view()
-        self.camera_mgr.on_hide_view()
-        self.game_interface_mgr.on_hide_view()
+        # a player dropped while playing is never released from pyglet's audio thread
+        self.song_mgr.stop()
+        self.session.close()
+        self.replay_recorder.on_hide_view()
+
+        if not self.note_mgr.is_bot_play and self.replay_recorder.events and not self.replay_recorder.practice:
+            replay = self.replay_recorder.build(self.score_mgr)
+            replay.save(f"replays/{self._song_data['name']}_{time.strftime('%Y%m%d_%H%M%S')}.rfrp")
+
+        print(f"[frames] {self.frame_scheduler.report()}")
+        print(f"[sync] {self.song_mgr.sync.report()}")
+        self._gc_monitor.remove()
+        print(f"[gc] {self.gc_mgr.report()} {self._gc_monitor.report()}")
+        for line in self.frame_scheduler.hitch_log():
+            print(f"[hitch] {line}")
     
         return super().on_hide_view()
 
+    def on_fixed_update(self, delta_time):
+        if self.song_mgr.paused:
+            return
+        self.note_mgr.fixed_update(delta_time)
+
     def on_update(self, delta_time):
+        if self.song_mgr.paused:
+            return
         self.song_mgr.update()
+        self.sfx_mgr.update()
+        self.gc_mgr.update(self.song_mgr.song_ms)
+        self.modchart_mgr.update(self.song_mgr.visual_ms)
         self.note_mgr.update(delta_time)
         self.receptor_mgr.update(delta_time)
         self.background_mgr.update(delta_time)
@@ -58,15 +104,20 @@ class MainGameView(arcade.View):
         self.game_interface_mgr.update(delta_time)
 
         # arcade.get_window().set_location(int(self._start_pos[0] + math.cos(self.song_mgr.song_ms / 1000 * 5) * 100), int(self._start_pos[1] + math.sin(self.song_mgr.song_ms / 1000 * 5) * 100))
-        # for receptor in self.receptor_mgr.receptors:
-        #     receptor.position = (receptor.spawn_x + math.cos(self.song_mgr.song_ms / 1000 * 2 + receptor.direction_index) * 15, receptor.spawn_y + math.sin(self.song_mgr.song_ms / 1000 * 2 + receptor.direction_index) * 15)
-        #     receptor.angle = math.sin(self.song_mgr.song_ms / 1000 * 5 + receptor.direction_index) * 15 + math.cos(self.song_mgr.song_ms / 1000 * 3 + receptor.direction_index) * 10
 
     def on_draw(self):
+        self.frame_scheduler.begin_frame()
         self.clear()
-        with self.camera_mgr.camera_world.activate():
-            self.background_mgr.draw_world()
-            self.character_mgr.draw()
+        # throttled redraws are only for a world where nothing moved
+        if self.camera_mgr.world_dirty or self.character_mgr.dirty:
+            self.frame_scheduler.invalidate()
+        if self.frame_scheduler.world_due():
+            with self._world_layer.render():
+                with self.camera_mgr.camera_world.activate():
+                    self.background_mgr.draw_world()
+                    self.character_mgr.draw()
+            self.camera_mgr.world_dirty = self.character_mgr.dirty = False
+        self._world_layer.draw()
         with self.camera_mgr.camera_ui.activate():
             self.background_mgr.draw_camera()
             self.game_interface_mgr.draw()
@@ -74,10 +125,41 @@ class MainGameView(arcade.View):
             self.receptor_mgr.draw()
             self.note_mgr.draw()
         
-        arcade.draw_text(f"FPS : {math.floor(arcade.get_fps())}", 20, arcade.get_window().height - 20, arcade.color.GREEN, 24, bold=False)
+        scheduler = self.frame_scheduler
+        self._fps_text.text = f"FPS : {math.floor(arcade.get_fps())} / {scheduler.refresh_rate:g}  dropped : {scheduler.dropped_frames}  late : {scheduler.late_frames}"
+        if self.song_mgr.playback_rate != 1.0:
+            self._fps_text.text += f"  rate : {self.song_mgr.playback_rate:.2f}"
+        self._fps_text.draw()
+
+    def toggle_pause(self):
+        if self.song_mgr.paused:
+            self.song_mgr.resume()
+        else:
+            self.song_mgr.pause()
+        self.frame_scheduler.set_idle(self.song_mgr.paused)
+
+    def seek_section(self, step: int):
+        """Practice: jump *step* sections from the one playing."""
+        index = self.song_mgr.section_index(self.song_mgr.song_ms)
+        self.session.seek_section(index + step if index >= 0 else len(self.song_mgr.sections) - 1)
+        self.frame_scheduler.invalidate()
 
     def on_key_press(self, key, modifiers):
-        if self.note_mgr.is_bot_play:
+        if key == arcade.key.ENTER:
+            self.toggle_pause()
+            return
+        if key in (arcade.key.PAGEUP, arcade.key.PAGEDOWN):
+            self.seek_section(-1 if key == arcade.key.PAGEUP else 1)
+            return
+        if key == arcade.key.BACKSPACE:
+            self.snapshot_mgr.rewind(self.song_mgr.song_ms - DEFAULT_REWIND_MS)
+            self.frame_scheduler.invalidate()
+            return
+        if key in (arcade.key.MINUS, arcade.key.EQUAL):
+            step = PLAYBACK_RATE_STEP if key == arcade.key.EQUAL else -PLAYBACK_RATE_STEP
+            self.session.set_playback_rate(round(self.song_mgr.playback_rate + step, 2))
+            return
+        if self.note_mgr.is_bot_play or self.song_mgr.paused:
             return
         keys_arrow = {arcade.key.LEFT: 0, arcade.key.DOWN: 1, arcade.key.UP: 2, arcade.key.RIGHT: 3}
         keys_lane = {arcade.key.D: 0, arcade.key.F: 1, arcade.key.J: 2, arcade.key.K: 3}
@@ -89,7 +171,7 @@ class MainGameView(arcade.View):
             self.note_mgr.on_key_press(idx)
 
     def on_key_release(self, key, modifiers):
-        if self.note_mgr.is_bot_play:
+        if self.note_mgr.is_bot_play or self.song_mgr.paused:
             return
         keys_arrow = {arcade.key.LEFT: 0, arcade.key.DOWN: 1, arcade.key.UP: 2, arcade.key.RIGHT: 3}
         keys_lane = {arcade.key.D: 0, arcade.key.F: 1, arcade.key.J: 2, arcade.key.K: 3}
@@ -0,0 +1,13 @@
+from sources.game.replay import Replay
+
+
+def test_round_trip_keeps_negative_and_backward_times():
+    # the song clock starts at -audio_offset_ms, and clock corrections can step it back
+    events = [(-42_500, 0, True), (-1_000, 0, False), (250_000, 3, True), (249_990, 2, True), (251_000, 3, False)]
+    replay = Replay("test", bytes(32), {"sick": 45.0}, events, 350, 0.98, {"sick": 2}, end_ms=60_000.0)
+
+    loaded = Replay.from_bytes(replay.to_bytes())
+
+    assert loaded.events == events
+    assert loaded.claimed_result == replay.claimed_result
+    assert loaded.end_ms == 60_000.0
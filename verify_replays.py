@@ -0,0 +1,121 @@
+"""Verify a directory of submitted replays by replaying them headless on a process pool.
+
+    python verify_replays.py replays/ --workers 8 --output report.json
+
+Replays are grouped by chart and handed out in chunks, so every worker loads
+and parses a chart once and then reuses the simulation for the rest of its runs.
+"""
+import argparse
+import collections
+import concurrent.futures
+import json
+import os
+import pathlib
+import sys
+import time
+
+from sources.game.replay import Replay, chart_hash, compare_results, play_replay
+
+CHUNK_SIZE = 16
+REPLAY_SUFFIX = ".rfrp"
+
+# per worker process: chart hash -> (song data, reusable HeadlessSimulation)
+_worker_charts = {}
+_worker_score_config = None
+_worker_judgement_windows = None
+
+
+def _init_worker(score_config: dict, judgement_windows: dict):
+    global _worker_score_config, _worker_judgement_windows
+    _worker_score_config = score_config
+    _worker_judgement_windows = judgement_windows
+
+
+def _load_chart(song_name: str, hash_bytes: bytes):
+    if hash_bytes not in _worker_charts:
+        from sources.game import HeadlessSimulation
+
+        with open(f"assets/songs/{song_name}/data.json", 'r') as f:
+            song_data = json.load(f)
+        if chart_hash(song_data) != hash_bytes:
+            raise ValueError(f"chart '{song_name}' on this server does not match the replay")
+        _worker_charts[hash_bytes] = (song_data, HeadlessSimulation(song_data, score_config=_worker_score_config))
+    return _worker_charts[hash_bytes]
+
+
+def _verify_chunk(song_name: str, hash_bytes: bytes, paths: list[str]) -> list[dict]:
+    reports = []
+    for path in paths:
+        report = {"replay": path, "song": song_name}
+        try:
+            replay = Replay.load(path)
+            song_data, sim = _load_chart(song_name, hash_bytes)
+            recomputed = play_replay(replay, song_data, simulation=sim)
+            mismatches = compare_results(replay.claimed_result, recomputed)
+            if replay.judgement_windows != _worker_judgement_windows:
+                mismatches.append(f"judgement windows: replay {replay.judgement_windows}, server {_worker_judgement_windows}")
+            report.update(status="mismatch" if mismatches else "ok", claimed=replay.claimed_result,
+                          recomputed=recomputed, mismatches=mismatches)
+        except Exception as e:
+            report.update(status="error", error=str(e))
+        reports.append(report)
+    return reports
+
+
+def _group_by_chart(directory: pathlib.Path) -> tuple[dict, list[dict]]:
+    groups = collections.defaultdict(list)
+    unreadable = []
+    for path in sorted(directory.rglob(f"*{REPLAY_SUFFIX}")):
+        try:
+            replay = Replay.load(path)
+        except Exception as e:
+            unreadable.append({"replay": str(path), "status": "error", "error": str(e)})
+            continue
+        groups[(replay.song_name, replay.chart_hash)].append(str(path))
+    return groups, unreadable
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=pathlib.Path, help="directory searched recursively for replay files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes (default: all cores)")
+    parser.add_argument("--output", help="write the per-replay report to this JSON file")
+    args = parser.parse_args(argv)
+
+    with open("assets/config/score.json", 'r') as f:
+        score_config = json.load(f)
+    with open("assets/config/judgements.json", 'r') as f:
+        judgement_windows = json.load(f)
+
+    start = time.perf_counter()
+    groups, reports = _group_by_chart(args.directory)
+
+    with concurrent.futures.ProcessPoolExecutor(
+        max_workers=args.workers, initializer=_init_worker, initargs=(score_config, judgement_windows)
+    ) as pool:
+        futures = [
+            pool.submit(_verify_chunk, song_name, hash_bytes, paths[i:i + CHUNK_SIZE])
+            for (song_name, hash_bytes), paths in groups.items()
+            for i in range(0, len(paths), CHUNK_SIZE)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            reports.extend(future.result())
+
+    reports.sort(key=lambda r: r["replay"])
+    for report in reports:
+        detail = "; ".join(report.get("mismatches", [])) or report.get("error", "")
+        print(f"{report['status']:<8} {report['replay']} {detail}".rstrip())
+
+    counts = collections.Counter(r["status"] for r in reports)
+    elapsed = time.perf_counter() - start
+    print(f"\n{len(reports)} replays in {elapsed:.1f}s: {counts['ok']} ok, {counts['mismatch']} mismatch, {counts['error']} error")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(reports, f, indent=4)
+
+    return 0 if counts["ok"] == len(reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())